@@ -52,6 +52,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
+        compare_type=True,
     )
 
     with context.begin_transaction():
@@ -59,7 +61,14 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite can't ALTER most column properties, so autogenerate emits
+        # batch (copy-and-move) operations there; Postgres alters in place.
+        render_as_batch=connection.dialect.name == "sqlite",
+        compare_type=True,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
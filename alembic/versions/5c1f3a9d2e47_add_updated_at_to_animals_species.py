@@ -0,0 +1,32 @@
+"""add updated_at to animals and species
+
+Revision ID: 5c1f3a9d2e47
+Revises: 0e0ab8647905
+Create Date: 2025-09-20 14:12:05.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f3a9d2e47'
+down_revision: Union[str, Sequence[str], None] = '0e0ab8647905'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('animals', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('species', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE animals SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE species SET updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('species', 'updated_at')
+    op.drop_column('animals', 'updated_at')
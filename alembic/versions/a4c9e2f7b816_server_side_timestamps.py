@@ -0,0 +1,56 @@
+"""server-side timestamps
+
+Revision ID: a4c9e2f7b816
+Revises: f62c0d8e7b31
+Create Date: 2025-10-02 11:26:43.915302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e2f7b816'
+down_revision: Union[str, Sequence[str], None] = 'f62c0d8e7b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ('users', 'created_at'),
+    ('species', 'updated_at'),
+    ('animals', 'created_at'),
+    ('animals', 'updated_at'),
+]
+
+
+def _utcnow():
+    # Same SQL as core.dialects.utcnow, spelled out so the migration stays fixed.
+    if op.get_context().dialect.name == 'postgresql':
+        return sa.text("timezone('utc', now())")
+    return sa.text("(strftime('%Y-%m-%d %H:%M:%f', 'now'))")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.DateTime(),
+                existing_nullable=True,
+                server_default=_utcnow(),
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in reversed(COLUMNS):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.DateTime(),
+                existing_nullable=True,
+                server_default=None,
+            )
@@ -0,0 +1,37 @@
+"""job leases and outputs
+
+Revision ID: b2d4f6a8c013
+Revises: d5e7a9c3b412
+Create Date: 2025-10-09 10:04:52.618230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d4f6a8c013'
+down_revision: Union[str, Sequence[str], None] = 'd5e7a9c3b412'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('locked_until', sa.DateTime(), nullable=True))
+    op.create_table('job_outputs',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('items', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'seq')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('job_outputs')
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('locked_until')
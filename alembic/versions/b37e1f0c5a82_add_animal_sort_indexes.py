@@ -0,0 +1,34 @@
+"""add animal sort indexes
+
+Revision ID: b37e1f0c5a82
+Revises: 8a4d6e2b9c13
+Create Date: 2025-09-29 18:27:44.105936
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b37e1f0c5a82'
+down_revision: Union[str, Sequence[str], None] = '8a4d6e2b9c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_animals_age_id', 'animals', ['age', 'id'], unique=False)
+    op.create_index('ix_animals_sex_id', 'animals', ['sex', 'id'], unique=False)
+    op.create_index('ix_animals_created_at_id', 'animals', ['created_at', 'id'], unique=False)
+    op.create_index('ix_animals_species_id_id', 'animals', ['species_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_animals_species_id_id', table_name='animals')
+    op.drop_index('ix_animals_created_at_id', table_name='animals')
+    op.drop_index('ix_animals_sex_id', table_name='animals')
+    op.drop_index('ix_animals_age_id', table_name='animals')
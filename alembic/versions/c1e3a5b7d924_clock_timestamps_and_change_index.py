@@ -0,0 +1,51 @@
+"""clock timestamps and change index
+
+Revision ID: c1e3a5b7d924
+Revises: b2d4f6a8c013
+Create Date: 2025-10-10 09:41:27.308615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1e3a5b7d924'
+down_revision: Union[str, Sequence[str], None] = 'b2d4f6a8c013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ('users', 'created_at'),
+    ('species', 'updated_at'),
+    ('animals', 'created_at'),
+    ('animals', 'updated_at'),
+]
+
+
+def _set_defaults(sql: str) -> None:
+    # SQLite's default already reads the clock per statement.
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    for table, column in COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.DateTime(),
+            existing_nullable=True,
+            server_default=sa.text(sql),
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _set_defaults("timezone('utc', clock_timestamp())")
+    op.create_index('ix_changes_entity_entity_id_seq', 'changes', ['entity', 'entity_id', 'seq'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_changes_entity_entity_id_seq', table_name='changes')
+    _set_defaults("timezone('utc', now())")
@@ -0,0 +1,43 @@
+"""archive animals
+
+Revision ID: c8b3f5a1e604
+Revises: a4c9e2f7b816
+Create Date: 2025-10-06 09:41:17.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8b3f5a1e604'
+down_revision: Union[str, Sequence[str], None] = 'a4c9e2f7b816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_animals_age_id': ['age', 'id'],
+    'ix_animals_sex_id': ['sex', 'id'],
+    'ix_animals_created_at_id': ['created_at', 'id'],
+    'ix_animals_species_id_id': ['species_id', 'id'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('animals', sa.Column('archived_at', sa.DateTime(), nullable=True))
+    live = sa.text('archived_at IS NULL')
+    for name, columns in INDEXES.items():
+        op.drop_index(name, table_name='animals')
+        op.create_index(name, 'animals', columns, unique=False, sqlite_where=live, postgresql_where=live)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, columns in INDEXES.items():
+        op.drop_index(name, table_name='animals')
+        op.create_index(name, 'animals', columns, unique=False)
+    with op.batch_alter_table('animals') as batch_op:
+        batch_op.drop_column('archived_at')
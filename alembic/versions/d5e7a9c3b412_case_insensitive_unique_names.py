@@ -0,0 +1,31 @@
+"""case-insensitive unique names
+
+Revision ID: d5e7a9c3b412
+Revises: c8b3f5a1e604
+Create Date: 2025-10-08 14:12:05.381927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e7a9c3b412'
+down_revision: Union[str, Sequence[str], None] = 'c8b3f5a1e604'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fails if rows already differ only in case; rename those first.
+    op.create_index('ix_species_name_lower', 'species', [sa.text('lower(name)')], unique=True)
+    op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_username_lower', table_name='users')
+    op.drop_index('ix_species_name_lower', table_name='species')
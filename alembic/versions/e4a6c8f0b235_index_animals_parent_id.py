@@ -0,0 +1,28 @@
+"""index animals parent_id
+
+Revision ID: e4a6c8f0b235
+Revises: c1e3a5b7d924
+Create Date: 2025-10-13 10:17:05.442908
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a6c8f0b235'
+down_revision: Union[str, Sequence[str], None] = 'c1e3a5b7d924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_animals_parent_id'), 'animals', ['parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_animals_parent_id'), table_name='animals')
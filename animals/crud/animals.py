@@ -1,27 +1,49 @@
-from typing import cast, TypeVar, Type, Optional
+from functools import lru_cache
+from typing import TypeVar, Type, Optional, Collection
 
 from fastapi import HTTPException
-from sqlalchemy import select, func, ScalarResult
+from sqlalchemy import select, update, func, or_, case, bindparam, Integer, ScalarResult
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload, aliased, DeclarativeBase
 
-from animals.schemas.animals import AnimalCreate, AnimalUpdate, AnimalPartialUpdate, AnimalFilters
-from core.models import Animal, Specie
+from animals.schemas.animals import (
+    AnimalCreate,
+    AnimalUpdate,
+    AnimalPartialUpdate,
+    AnimalFilters,
+    AnimalBulkSelection,
+    AnimalBulkChanges,
+    AnimalStats,
+    AnimalSpeciesStats,
+    AnimalSexStats,
+    AnimalAgeBucket,
+    ANIMAL_EXPANDABLE,
+)
+from changes.crud import record_change, record_row_changes, change_signal
+from core.cache import ResultCache
+from core.dialects import utcnow
+from core.integrity import conflict_error
+from core.models import Animal, Change, Specie
+from core.settings import settings
 
 T = TypeVar("T", bound=DeclarativeBase)
 
+stats_cache = ResultCache(maxsize=settings.stats_cache_size, ttl=settings.stats_cache_ttl)
+change_signal.add_listener(stats_cache.clear)
+
 
 async def get_object_or_404(
         session: AsyncSession,
         model: Type[T],
         obj_id: Optional[int],
         field: str = "id",
+        options: Collection = (),
 ) -> Optional[T]:
     if obj_id is None:
         return None
 
-    statement = select(model).where(getattr(model, field) == obj_id)
+    statement = select(model).options(*options).where(getattr(model, field) == obj_id)
     result = await session.execute(statement)
     obj = result.scalar_one_or_none()
 
@@ -31,105 +53,264 @@ async def get_object_or_404(
     return obj
 
 
-async def get_parent_by_id(session: AsyncSession, animal_id: int):
-    result = await session.execute(
-        select(Animal).options(
-            joinedload(Animal.species),
-            joinedload(Animal.parent),
-            selectinload(Animal.children).joinedload(Animal.species)
-        ).where(Animal.id == animal_id)
-    )
+def live(Animal=Animal):
+    return Animal.archived_at.is_(None)
+
+
+async def get_parent_by_id(session: AsyncSession, animal_id: int, include_archived: bool = False):
+    # Parent and children are loaded whether archived or not, so lineage stays complete.
+    statement = select(Animal).options(
+        joinedload(Animal.species),
+        joinedload(Animal.parent).joinedload(Animal.species),
+        selectinload(Animal.children).joinedload(Animal.species)
+    ).where(Animal.id == animal_id)
+    if not include_archived:
+        statement = statement.where(live())
+    result = await session.execute(statement)
     return result.scalars().first()
 
 
-def apply_filters(query, filters, Animal):
-    if not filters:
-        return query
-    conditions = []
+FILTER_FLAGS = ("only_parents", "only_children", "without_children", "include_archived")
 
+
+def filter_shape(filters: Optional[AnimalFilters]) -> tuple[tuple[str, ...], dict]:
+    """Split ``filters`` into a shape (which filters are set) and parameter values.
+
+    Requests with the same shape share one statement and differ only in the
+    values bound to it.
+    """
+    if not filters:
+        return (), {}
+    # Parameter names are prefixed so they can't clash with the column names
+    # SQLAlchemy uses for UPDATE ... SET parameters in the bulk endpoints.
+    params = {}
     if filters.name:
-        conditions.append(Animal.name.ilike(f"%{filters.name}%"))
+        params["filter_name"] = f"%{filters.name}%"
     if filters.sex:
-        conditions.append(Animal.sex == filters.sex)
+        params["filter_sex"] = filters.sex
     if filters.min_age is not None:
-        conditions.append(Animal.age >= filters.min_age)
+        params["filter_min_age"] = filters.min_age
     if filters.max_age is not None:
-        conditions.append(Animal.age <= filters.max_age)
+        params["filter_max_age"] = filters.max_age
     if filters.species:
-        conditions.append(Animal.species == filters.species)
-
-    if filters.only_parents:
+        params["filter_species"] = filters.species
+    if filters.min_children is not None:
+        params["filter_min_children"] = filters.min_children
+    if filters.max_children is not None:
+        params["filter_max_children"] = filters.max_children
+    flags = tuple(flag for flag in FILTER_FLAGS if getattr(filters, flag))
+    return tuple(params) + flags, params
+
+
+def filtered(query, shape: Collection[str], Animal):
+    """Add the WHERE/HAVING clauses for ``shape`` as bound parameters."""
+    conditions = [] if "include_archived" in shape else [live(Animal)]
+
+    if "filter_name" in shape:
+        conditions.append(Animal.name.ilike(bindparam("filter_name")))
+    if "filter_sex" in shape:
+        conditions.append(Animal.sex == bindparam("filter_sex"))
+    if "filter_min_age" in shape:
+        conditions.append(Animal.age >= bindparam("filter_min_age"))
+    if "filter_max_age" in shape:
+        conditions.append(Animal.age <= bindparam("filter_max_age"))
+    if "filter_species" in shape:
+        conditions.append(Animal.species.has(Specie.name == bindparam("filter_species")))
+
+    if "only_parents" in shape:
         conditions.append(Animal.children.any())
-    if filters.only_children:
+    if "only_children" in shape:
         conditions.append(Animal.parent_id.is_not(None))
-    if filters.without_children:
+    if "without_children" in shape:
         conditions.append(~Animal.children.any())
 
     if conditions:
         query = query.where(*conditions)
 
-    if filters.min_children is not None or filters.max_children is not None:
+    if "filter_min_children" in shape or "filter_max_children" in shape:
         Child = aliased(Animal)
         query = query.join(Child, Animal.children).group_by(Animal.id)
-        if filters.min_children is not None:
-            query = query.having(func.count(Child.id) >= filters.min_children)
-        if filters.max_children is not None:
-            query = query.having(func.count(Child.id) <= filters.max_children)
+        if "filter_min_children" in shape:
+            query = query.having(func.count(Child.id) >= bindparam("filter_min_children"))
+        if "filter_max_children" in shape:
+            query = query.having(func.count(Child.id) <= bindparam("filter_max_children"))
 
     return query
 
 
-async def get_animals(session: AsyncSession, page: int, size: int, filters: AnimalFilters):
-    query = (
+def apply_filters(query, filters, Animal):
+    shape, params = filter_shape(filters)
+    return filtered(query, shape, Animal).params(params)
+
+
+def sort_shape(sort: Optional[str]) -> tuple[tuple[str, bool], ...]:
+    """Normalize a validated ``sort`` such as ``-age,name`` to ``(field, descending)`` pairs.
+
+    ``id`` is always appended as a tiebreaker so OFFSET pages are stable. It
+    follows the direction of the leading key, so a single-key sort can be read
+    straight off that column's ``(column, id)`` index.
+    """
+    keys = {}
+    for field in (sort or "").split(","):
+        if field:
+            keys.setdefault(field.lstrip("-"), field.startswith("-"))
+    if "id" not in keys:
+        keys["id"] = next(iter(keys.values()), False)
+    return tuple(keys.items())
+
+
+def order_by_clauses(sort: tuple[tuple[str, bool], ...]) -> list:
+    return [
+        getattr(Animal, name).desc() if descending else getattr(Animal, name).asc()
+        for name, descending in sort
+    ]
+
+
+@lru_cache(maxsize=256)
+def _animals_statement(
+        shape: tuple[str, ...],
+        sort: tuple[tuple[str, bool], ...],
+        expand: frozenset[str],
+):
+    query = select(Animal)
+    if "parent" in expand:
+        query = query.options(selectinload(Animal.parent)
+                              .selectinload(Animal.species))
+    if "children" in expand:
+        query = query.options(selectinload(Animal.children)
+                              .selectinload(Animal.species))
+    if "species" in expand:
+        query = query.options(selectinload(Animal.species))
+    query = filtered(query, shape, Animal)
+    query = query.order_by(*order_by_clauses(sort))
+    return query.offset(bindparam("offset", type_=Integer)).limit(bindparam("limit", type_=Integer))
+
+
+def animals_statement(
+        page: int,
+        size: int,
+        filters: Optional[AnimalFilters],
+        sort: Optional[str] = None,
+        expand: Collection[str] = ANIMAL_EXPANDABLE,
+):
+    """The listing statement for this request's shape, built once and reused, and its parameters."""
+    shape, params = filter_shape(filters)
+    statement = _animals_statement(shape, sort_shape(sort), frozenset(expand))
+    return statement, {**params, "offset": (page - 1) * size, "limit": size}
+
+
+async def get_animals(
+        session: AsyncSession,
+        page: int,
+        size: int,
+        filters: AnimalFilters,
+        sort: Optional[str] = None,
+        expand: Collection[str] = ANIMAL_EXPANDABLE,
+):
+    statement, params = animals_statement(page, size, filters, sort, expand)
+    result = await session.scalars(statement, params)
+    return result.unique().all()
+
+
+async def get_animals_by_ids(
+        session: AsyncSession,
+        ids: list[int],
+        include_archived: bool = False,
+) -> dict[int, Animal]:
+    statement = (
         select(Animal)
-        .options(selectinload(Animal.parent))
+        .options(selectinload(Animal.parent).selectinload(Animal.species))
         .options(selectinload(Animal.children)
                  .selectinload(Animal.species))
         .options(selectinload(Animal.species))
+        .where(Animal.id.in_(set(ids)))
     )
-    query = apply_filters(query, filters, Animal)
-    query = query.offset((page - 1) * size).limit(size)
-    result = await session.scalars(query)
-    return result.unique().all()
-
+    if not include_archived:
+        statement = statement.where(live())
+    result = await session.scalars(statement)
+    return {animal.id: animal for animal in result}
 
-async def get_animals_count(session: AsyncSession) -> int:
-    return await session.scalar(select(func.count()).select_from(Animal))
 
+async def get_animals_count(session: AsyncSession, include_archived: bool = False) -> int:
+    statement = select(func.count()).select_from(Animal)
+    if not include_archived:
+        statement = statement.where(live())
+    return await session.scalar(statement)
 
-async def create_animal_full(animal: AnimalCreate, session: AsyncSession):
-    if animal.parent_id is not None:
-        await get_object_or_404(session, Animal, animal.parent_id)
 
-    if animal.species_id is not None:
-        await get_object_or_404(session, Specie, animal.species_id)
+async def get_animals_version(session: AsyncSession):
+    """``(seq, created_at)`` of the last change-log entry, or ``None``.
 
-    statement = select(Animal).where(
-        cast("ColumnElement[bool]", Animal.name == animal.name)
+    Every animal and species write is logged and seq is handed out in commit
+    order, so the latest entry versions the listing with one primary key
+    lookup.
+    """
+    result = await session.execute(
+        select(Change.seq, Change.created_at).order_by(Change.seq.desc()).limit(1)
     )
-    result = await session.execute(statement)
-    existing_animal = result.scalar_one_or_none()
+    return result.one_or_none()
 
-    if existing_animal:
-        raise HTTPException(status_code=400, detail="Animal with this name already exists")
 
-    db_animal = Animal(**animal.model_dump())
+def _related(model, animal_id: int, parent_id):
+    return or_(model.id == animal_id, model.parent_id == animal_id, model.id == parent_id)
 
-    session.add(db_animal)
-    await session.commit()
-    await session.refresh(db_animal)
 
-    stmt = select(Animal).options(
-        joinedload(Animal.species),
-        joinedload(Animal.parent)
+async def get_animal_version(session: AsyncSession, animal_id: int, include_archived: bool = False):
+    """Version of every row the detail payload of ``animal_id`` is built from.
 
-    ).where(
-        cast("ColumnElement[bool]", Animal.id == db_animal.id)
+    Covers the animal, its parent, its children and their species: the
+    latest change logged for any of them, and how many related rows there
+    are, which drops when a child moves to another parent. The first column
+    tells whether the animal itself exists (and is live, unless
+    ``include_archived``); the last one only serves Last-Modified.
+    """
+    Own = aliased(Animal)
+    Related = aliased(Animal)
+    parent_id = select(Own.parent_id).where(Own.id == animal_id).scalar_subquery()
+    found = Animal.id == animal_id
+    if not include_archived:
+        found = found & live()
+    related = _related(Related, animal_id, parent_id)
+    result = await session.execute(
+        select(
+            func.count(case((found, 1))),
+            func.count(Animal.id),
+            select(func.max(Change.seq)).where(or_(
+                (Change.entity == "animal") & Change.entity_id.in_(select(Related.id).where(related)),
+                (Change.entity == "specie") & Change.entity_id.in_(select(Related.species_id).where(related)),
+            )).scalar_subquery(),
+            func.max(Animal.updated_at),
+        ).where(_related(Animal, animal_id, parent_id))
     )
-    result = await session.execute(stmt)
-    db_animal_with_parent = result.scalar_one()
+    return result.one()
+
 
-    return db_animal_with_parent
+# Name uniqueness is enforced by the constraint alone, which also holds
+# between concurrent writers; violations map to these messages.
+ANIMAL_CONFLICTS = {"animals.name": "Animal with this name already exists"}
+
+
+async def create_animal_full(animal: AnimalCreate, session: AsyncSession):
+    # Load what the response shows up front; the new row itself comes back
+    # from INSERT ... RETURNING, so nothing is re-read after the commit.
+    parent = await get_object_or_404(session, Animal, animal.parent_id, options=[joinedload(Animal.species)])
+    species = await get_object_or_404(session, Specie, animal.species_id)
+
+    db_animal = Animal(
+        **animal.model_dump(exclude={"parent_id", "species_id"}, exclude_none=True),
+        parent=parent,
+        species=species,
+    )
+
+    session.add(db_animal)
+    try:
+        await session.flush()
+        record_change(session, "animal", db_animal, "create")
+        await session.commit()
+    except IntegrityError as error:
+        await session.rollback()
+        raise conflict_error(error, ANIMAL_CONFLICTS)
+    return db_animal
 
 
 async def update_animal(
@@ -138,31 +319,178 @@ async def update_animal(
         animal_update: AnimalUpdate | AnimalPartialUpdate,
         partial: bool = False,
 ) -> Animal:
-    if animal_update.name is not None:
-        existing_animal_query = await session.execute(
-            select(Animal).where(Animal.name == animal_update.name, Animal.id != animal.id)
+    values = animal_update.model_dump(exclude_unset=partial)
+    if values.get("created_at") is None:
+        # A PUT without created_at keeps the stored one instead of clearing it.
+        values.pop("created_at", None)
+    # Assign the related objects rather than their ids so the response doesn't
+    # need the relationships reloaded after the commit.
+    if "parent_id" in values:
+        animal.parent = await get_object_or_404(
+            session, Animal, values.pop("parent_id"), options=[joinedload(Animal.species)]
         )
-        existing_animal = existing_animal_query.scalar_one_or_none()
-        if existing_animal:
-            raise HTTPException(status_code=400, detail="Animal with this name already exists.")
-
-    if animal_update.parent_id is not None:
-        await get_object_or_404(session, Animal, animal_update.parent_id)
+    if "species_id" in values:
+        animal.species = await get_object_or_404(session, Specie, values.pop("species_id"))
 
-    if animal_update.species_id is not None:
-        await get_object_or_404(session, Specie, animal_update.species_id)
-
-    for name, value in animal_update.model_dump(exclude_unset=partial).items():
+    for name, value in values.items():
         setattr(animal, name, value)
     try:
+        await session.flush()
+        record_change(session, "animal", animal, "update")
         await session.commit()
-        await session.refresh(animal)
-    except IntegrityError:
+    except IntegrityError as error:
         await session.rollback()
-        raise HTTPException(status_code=400, detail="An integrity error occurred, likely a duplicate name.")
+        raise conflict_error(error, ANIMAL_CONFLICTS)
     return animal
 
 
-async def delete_animal(session: AsyncSession, animal: Animal) -> None:
-    await session.delete(animal)
+async def archive_animal(session: AsyncSession, animal: Animal) -> None:
+    """Take ``animal`` out of the live set; the row is kept for the records.
+
+    Its children keep ``parent_id``, so their lineage still resolves.
+    """
+    # RETURNING refreshes the loaded object with the database's timestamps.
+    await session.execute(
+        update(Animal)
+        .where(Animal.id == animal.id)
+        .values(archived_at=utcnow())
+        .returning(Animal)
+        .execution_options(populate_existing=True)
+    )
+    record_change(session, "animal", animal, "archive")
+    await session.commit()
+
+
+def _bulk_selection(selection: AnimalBulkSelection):
+    if selection.ids is not None:
+        return selection.ids
+    # An alias keeps the subquery from correlating with the UPDATE/DELETE target.
+    Target = aliased(Animal)
+    return apply_filters(select(Target.id), selection.filters, Target)
+
+
+def _selected_lineage(parent_id: int, selected):
+    """Count of selected rows among ``parent_id`` and its ancestors.
+
+    Any of them becoming a child of ``parent_id`` would close a cycle.
+    """
+    # UNION rather than UNION ALL, so a cycle already in the data ends the walk.
+    lineage = select(Animal.id, Animal.parent_id).where(Animal.id == parent_id).cte("lineage", recursive=True)
+    Up = aliased(Animal)
+    lineage = lineage.union(select(Up.id, Up.parent_id).where(Up.id == lineage.c.parent_id))
+    return select(func.count()).select_from(lineage).where(lineage.c.id.in_(select(Animal.id).where(selected)))
+
+
+async def bulk_update_animals(
+        session: AsyncSession,
+        selection: AnimalBulkSelection,
+        changes: AnimalBulkChanges,
+) -> int:
+    values = changes.model_dump(exclude_unset=True)
+    age_delta = values.pop("age_delta", None)
+    # Archived rows are records: bulk changes never touch them.
+    selected = Animal.id.in_(_bulk_selection(selection)) & live()
+
+    if values.get("parent_id") is not None:
+        await get_object_or_404(session, Animal, values["parent_id"])
+        if await session.scalar(_selected_lineage(values["parent_id"], selected)):
+            raise HTTPException(status_code=400, detail="An animal cannot be its own parent or ancestor")
+
+    if values.get("species_id") is not None:
+        await get_object_or_404(session, Specie, values["species_id"])
+
+    if age_delta is not None:
+        new_age = Animal.age + age_delta
+        out_of_range = await session.scalar(
+            select(func.count(Animal.id)).where(selected, or_(new_age < 0, new_age > 150))
+        )
+        if out_of_range:
+            raise HTTPException(
+                status_code=400,
+                detail=f"age_delta would move {out_of_range} animal(s) outside the 0-150 range",
+            )
+        values["age"] = new_age
+
+    result = await session.execute(
+        update(Animal)
+        .where(selected)
+        .values(**values)
+        .returning(*Animal.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    await record_row_changes(session, "animal", rows, "update")
+    await session.commit()
+    return len(rows)
+
+
+async def bulk_archive_animals(session: AsyncSession, selection: AnimalBulkSelection) -> int:
+    result = await session.execute(
+        update(Animal)
+        .where(Animal.id.in_(_bulk_selection(selection)), live())
+        .values(archived_at=utcnow())
+        .returning(*Animal.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    await record_row_changes(session, "animal", rows, "archive")
     await session.commit()
+    return len(rows)
+
+
+async def get_animal_stats(session: AsyncSession, filters: AnimalFilters, age_bucket: int) -> AnimalStats:
+    key = (filters.model_dump_json(), age_bucket)
+    hit, stats = stats_cache.get(key)
+    if hit:
+        return stats
+    generation = stats_cache.generation
+
+    conditions = [] if filters.include_archived else [live()]
+    if filters.model_dump(exclude_defaults=True, exclude={"include_archived"}):
+        Target = aliased(Animal)
+        conditions.append(Animal.id.in_(apply_filters(select(Target.id), filters, Target)))
+
+    species_rows = await session.execute(
+        select(
+            Animal.species_id,
+            Specie.name,
+            func.count(Animal.id),
+            func.count(case((Animal.children.any(), Animal.id))),
+        )
+        .outerjoin(Specie, Animal.species_id == Specie.id)
+        .where(*conditions)
+        .group_by(Animal.species_id, Specie.name)
+        .order_by(Animal.species_id)
+    )
+    sex_rows = (await session.execute(
+        select(Animal.sex, func.count(Animal.id))
+        .where(*conditions)
+        .group_by(Animal.sex)
+        .order_by(Animal.sex)
+    )).all()
+    bucket = Animal.age - Animal.age % age_bucket
+    age_rows = await session.execute(
+        select(bucket, func.count(Animal.id))
+        .where(*conditions)
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+
+    total = sum(count for _, count in sex_rows)
+    stats = AnimalStats(
+        total=total,
+        by_species=[
+            AnimalSpeciesStats(species_id=species_id, species=name, count=count, parents=parents)
+            for species_id, name, count, parents in species_rows
+        ],
+        by_sex=[
+            AnimalSexStats(sex=sex, count=count, share=round(count / total, 4))
+            for sex, count in sex_rows
+        ],
+        by_age=[
+            AnimalAgeBucket(min_age=start, max_age=start + age_bucket - 1, count=count)
+            for start, count in age_rows
+        ],
+    )
+    stats_cache.set(key, stats, generation)
+    return stats
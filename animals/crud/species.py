@@ -1,4 +1,3 @@
-from fastapi import HTTPException
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,13 +7,28 @@ from animals.schemas.species import (
     SpeciesUpdate,
     SpeciesPartialUpdate
 )
+from changes.crud import record_change, change_signal
+from core.cache import ResultCache
+from core.integrity import conflict_error
 from core.models import Specie
+from core.settings import settings
+
+
+# Species are reference data: read on most pages, written rarely.
+species_cache = ResultCache(maxsize=1, ttl=settings.species_cache_ttl)
+change_signal.add_listener(species_cache.clear)
 
 
 async def list_species(session: AsyncSession):
+    hit, cached = species_cache.get(None)
+    if hit:
+        return cached
+    generation = species_cache.generation
     stmt = select(Specie)
     result = await session.scalars(stmt)
-    return result.all()
+    species = result.all()
+    species_cache.set(None, species, generation)
+    return species
 
 
 async def get_specie_by_id(session: AsyncSession, specie_id: int):
@@ -23,17 +37,21 @@ async def get_specie_by_id(session: AsyncSession, specie_id: int):
     return result.first()
 
 
-async def create_specie(session: AsyncSession, species_in: SpeciesCreate):
-    exist_specie = await session.execute(
-        select(Specie).where(Specie.name == species_in.name)
-    )
-    if exist_specie.scalar_one_or_none():
-        raise HTTPException(status_code=401, detail="Species with this name already exists")
+# Uniqueness is left to the constraints: a SELECT beforehand costs a round
+# trip and still lets two concurrent writers through.
+SPECIE_CONFLICTS = {"species.name": "Species with this name already exists"}
 
+
+async def create_specie(session: AsyncSession, species_in: SpeciesCreate):
     stmt = Specie(**species_in.model_dump())
     session.add(stmt)
-    await session.commit()
-    await session.refresh(stmt)
+    try:
+        await session.flush()
+        record_change(session, "specie", stmt, "create")
+        await session.commit()
+    except IntegrityError as error:
+        await session.rollback()
+        raise conflict_error(error, SPECIE_CONFLICTS)
     return stmt
 
 
@@ -43,25 +61,23 @@ async def update_specie(
         specie_update: SpeciesUpdate | SpeciesPartialUpdate,
         partial: bool = False,
 ) -> Specie:
-    if specie_update.name is not None:
-        existing_animal_query = await session.execute(
-            select(Specie).where(Specie.name == specie_update.name, Specie.id != specie.id)
-        )
-        existing_specie = existing_animal_query.scalar_one_or_none()
-        if existing_specie:
-            raise HTTPException(status_code=400, detail="Animal with this name already exists.")
-
     for name, value in specie_update.model_dump(exclude_unset=partial).items():
         setattr(specie, name, value)
     try:
+        await session.flush()
+        record_change(session, "specie", specie, "update")
         await session.commit()
-        await session.refresh(specie)
-    except IntegrityError:
+    except IntegrityError as error:
         await session.rollback()
-        raise HTTPException(status_code=400, detail="An integrity error occurred, likely a duplicate name.")
+        raise conflict_error(error, SPECIE_CONFLICTS)
     return specie
 
 
 async def delete_specie(session: AsyncSession, specie: Specie) -> None:
     await session.delete(specie)
+    await session.flush()
+    record_change(session, "specie", specie, "delete")
+    # The flush cleared species_id on every animal of this species.
+    for animal in specie.animals:
+        record_change(session, "animal", animal, "update")
     await session.commit()
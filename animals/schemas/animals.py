@@ -1,12 +1,22 @@
 import enum
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Annotated
 
 from pydantic import BaseModel, Field, model_validator
 
 from animals.schemas.species import SpeciesRead
 
 
+ANIMAL_SORT_FIELDS = ("id", "name", "age", "sex", "created_at", "species_id")
+_sort_field = "-?(" + "|".join(ANIMAL_SORT_FIELDS) + ")"
+ANIMAL_SORT_PATTERN = rf"^{_sort_field}(,{_sort_field}){{0,3}}$"
+
+ANIMAL_FIELDS = ("id", "name", "age", "sex", "created_at", "archived_at")
+ANIMAL_FIELDS_PATTERN = rf"^({'|'.join(ANIMAL_FIELDS)})(,({'|'.join(ANIMAL_FIELDS)}))*$"
+ANIMAL_EXPANDABLE = ("species", "parent", "children")
+ANIMAL_EXPAND_PATTERN = rf"^(({'|'.join(ANIMAL_EXPANDABLE)})(,({'|'.join(ANIMAL_EXPANDABLE)}))*)?$"
+
+
 class AnimalBase(BaseModel):
     id: int
     name: str
@@ -14,6 +24,7 @@ class AnimalBase(BaseModel):
     age: int
     sex: str
     created_at: datetime
+    archived_at: Optional[datetime] = None
 
 
 class AnimalCreate(BaseModel):
@@ -24,15 +35,10 @@ class AnimalCreate(BaseModel):
     parent_id: Optional[int] = Field(None, ge=1)
     created_at: Optional[datetime] = None
 
-    @model_validator(mode="before")
-    def set_created_at(cls, values):
-        if not values.get("created_at"):
-            values["created_at"] = datetime.utcnow()
-        return values
-
     @model_validator(mode="after")
     def validate_created_at(cls, model):
-        if model.created_at > datetime.utcnow():
+        # Left out, the database fills it in on insert.
+        if model.created_at is not None and model.created_at > datetime.utcnow():
             raise ValueError("created_at cannot be in the future")
         return model
 
@@ -59,6 +65,7 @@ class AnimalRead(BaseModel):
     sex: str
     parent: Optional["AnimalBase"] = None
     created_at: datetime
+    archived_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -68,11 +75,39 @@ class AnimalReadParentChildren(AnimalRead):
     children: List[AnimalBase] = []
 
 
+class AnimalListItem(BaseModel):
+    """Listing entry; fields left out through ``fields``/``expand`` are omitted."""
+    id: int
+    name: Optional[str] = None
+    species: Optional[SpeciesRead] = None
+    age: Optional[int] = None
+    sex: Optional[str] = None
+    parent: Optional[AnimalBase] = None
+    created_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
+    children: Optional[List[AnimalBase]] = None
+
+
 class PaginatedAnimals(BaseModel):
     total: int
     page: int
     size: int
-    animals: list[AnimalReadParentChildren] = []
+    animals: list[AnimalListItem] = []
+
+
+class AnimalBatchRequest(BaseModel):
+    ids: List[Annotated[int, Field(ge=1)]] = Field(min_length=1, max_length=1000)
+    include_archived: bool = False
+
+
+class AnimalBatchItem(BaseModel):
+    id: int
+    found: bool
+    animal: Optional[AnimalReadParentChildren] = None
+
+
+class AnimalBatch(BaseModel):
+    animals: list[AnimalBatchItem] = []
 
 
 class Gender(str, enum.Enum):
@@ -91,6 +126,7 @@ class AnimalFilters(BaseModel):
     only_parents: bool = Field(False, description="Тільки ті, що мають батьків")
     min_children: Optional[int] = Field(None, ge=0, description="Мінімальний вік")
     max_children: Optional[int] = Field(None, ge=0, le=100, description="Максимальний вік")
+    include_archived: bool = Field(False, description="Також архівні тварини")
 
     @model_validator(mode='before')
     def check_min_max_values(cls, values):
@@ -122,3 +158,75 @@ class AnimalFilters(BaseModel):
         if only_parents and without_children:
             raise ValueError('Параметри "only_parents" та "without_children" конфліктують.')
         return values
+
+
+class AnimalBulkChanges(BaseModel):
+    species_id: Optional[int] = Field(None, ge=1)
+    age: Optional[int] = Field(None, ge=0, le=150)
+    age_delta: Optional[int] = Field(None, ge=-150, le=150)
+    sex: Optional[str] = Field(None, pattern=r"^(male|female|other)$")
+    parent_id: Optional[int] = Field(None, ge=1)
+
+    @model_validator(mode="after")
+    def check_changes(cls, model):
+        if not model.model_fields_set:
+            raise ValueError("At least one field must be changed")
+        for field in ("age", "age_delta", "sex"):
+            if field in model.model_fields_set and getattr(model, field) is None:
+                raise ValueError(f'"{field}" cannot be null')
+        if model.age is not None and model.age_delta is not None:
+            raise ValueError('"age" and "age_delta" cannot be set together')
+        return model
+
+
+class AnimalBulkSelection(BaseModel):
+    ids: Optional[List[Annotated[int, Field(ge=1)]]] = Field(None, min_length=1, max_length=10000)
+    filters: Optional[AnimalFilters] = None
+
+    @model_validator(mode="after")
+    def check_selection(cls, model):
+        if (model.ids is None) == (model.filters is None):
+            raise ValueError('Exactly one of "ids" or "filters" must be given')
+        # An empty filter would select every live animal.
+        if model.filters is not None and not model.filters.model_dump(
+                exclude_defaults=True, exclude={"include_archived"}):
+            raise ValueError('"filters" must set at least one filter')
+        return model
+
+
+class AnimalBulkUpdate(AnimalBulkSelection):
+    changes: AnimalBulkChanges
+
+
+class AnimalBulkDelete(AnimalBulkSelection):
+    pass
+
+
+class AnimalBulkResult(BaseModel):
+    affected: int
+
+
+class AnimalSpeciesStats(BaseModel):
+    species_id: Optional[int] = None
+    species: Optional[str] = None
+    count: int
+    parents: int
+
+
+class AnimalSexStats(BaseModel):
+    sex: str
+    count: int
+    share: float
+
+
+class AnimalAgeBucket(BaseModel):
+    min_age: int
+    max_age: int
+    count: int
+
+
+class AnimalStats(BaseModel):
+    total: int
+    by_species: list[AnimalSpeciesStats] = []
+    by_sex: list[AnimalSexStats] = []
+    by_age: list[AnimalAgeBucket] = []
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Request, Response, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from animals import crud
 from animals.crud import animals
-from animals.crud.animals import get_parent_by_id, get_animals_count, get_animals
+from animals.crud.animals import (
+    get_parent_by_id,
+    get_animals,
+    get_animals_count,
+    get_animals_by_ids,
+    get_animals_version,
+    get_animal_version,
+)
 from animals.dependencies import get_animal_by_id
 from animals.schemas.animals import (
     AnimalReadParentChildren,
@@ -12,51 +19,225 @@ from animals.schemas.animals import (
     AnimalCreate,
     AnimalUpdate,
     AnimalPartialUpdate,
-    PaginatedAnimals, AnimalFilters
+    PaginatedAnimals, AnimalFilters,
+    ANIMAL_SORT_FIELDS,
+    ANIMAL_SORT_PATTERN,
+    ANIMAL_FIELDS,
+    ANIMAL_FIELDS_PATTERN,
+    ANIMAL_EXPANDABLE,
+    ANIMAL_EXPAND_PATTERN,
+    AnimalListItem,
+    AnimalBatch,
+    AnimalBatchItem,
+    AnimalBatchRequest,
+    AnimalBulkUpdate,
+    AnimalBulkDelete,
+    AnimalBulkResult,
+    AnimalStats,
 )
 from auth.crud import get_current_user
+from auth.schemas import UserRead
 from core import db_helper
+from core.idempotency import idempotent
+from core.singleflight import singleflight
+from core.http_cache import make_etag, conditional_response, cache_headers
 from core.models import Animal
+
 router = APIRouter(prefix="/api/v1/animals", tags=["animals"])
 
 
 @router.get(
     "/",
     response_model=PaginatedAnimals,
+    response_model_exclude_unset=True,
     dependencies=[Depends(get_current_user)],
 )
 async def list_animals(
+        request: Request,
+        response: Response,
         page: int = Query(1, ge=1),
         size: int = Query(10, ge=1, le=100),
+        sort: str | None = Query(
+            None,
+            pattern=ANIMAL_SORT_PATTERN,
+            description=f"Comma-separated fields, '-' for descending: {', '.join(ANIMAL_SORT_FIELDS)}",
+        ),
+        fields: str | None = Query(
+            None,
+            pattern=ANIMAL_FIELDS_PATTERN,
+            description=f"Scalar fields to return (id is always included): {', '.join(ANIMAL_FIELDS)}",
+        ),
+        expand: str | None = Query(
+            None,
+            pattern=ANIMAL_EXPAND_PATTERN,
+            description=f"Relations to embed, empty for none: {', '.join(ANIMAL_EXPANDABLE)}",
+        ),
         session: AsyncSession = Depends(db_helper.scoped_session_dependency),
         filters: AnimalFilters = Depends()
 ):
-    total = await get_animals_count(session)
-    animals = await get_animals(session=session, page=page, size=size, filters=filters)
+    seq, last_modified = await get_animals_version(session) or (None, None)
+    etag = make_etag("animals", seq, request.url.query)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    selected_fields = {"id", *fields.split(",")} if fields else set(ANIMAL_FIELDS)
+    selected_relations = set(filter(None, expand.split(","))) if expand is not None else set(ANIMAL_EXPANDABLE)
+    animals = await get_animals(
+        session=session,
+        page=page,
+        size=size,
+        filters=filters,
+        sort=sort,
+        expand=selected_relations,
+    )
 
     return PaginatedAnimals(
-        total=total,
+        total=await get_animals_count(session, include_archived=filters.include_archived),
         page=page,
         size=size,
         animals=[
-            AnimalReadParentChildren.model_validate(animal, from_attributes=True)
+            AnimalListItem.model_validate(
+                {name: getattr(animal, name) for name in selected_fields | selected_relations},
+                from_attributes=True,
+            )
             for animal in animals
         ],
     )
 
 
+async def _read_batch(session: AsyncSession, ids: list[int], include_archived: bool = False) -> AnimalBatch:
+    found = await get_animals_by_ids(session, ids, include_archived)
+    return AnimalBatch(
+        animals=[
+            AnimalBatchItem(
+                id=animal_id,
+                found=animal_id in found,
+                animal=(
+                    AnimalReadParentChildren.model_validate(found[animal_id], from_attributes=True)
+                    if animal_id in found else None
+                ),
+            )
+            for animal_id in ids
+        ],
+    )
+
+
+@router.get(
+    "/batch",
+    response_model=AnimalBatch,
+    dependencies=[Depends(get_current_user)],
+)
+async def read_animals_batch(
+        ids: str = Query(
+            ...,
+            pattern=r"^[1-9]\d*(,[1-9]\d*){0,99}$",
+            description="Comma-separated animal ids, up to 100; use POST for larger sets",
+        ),
+        include_archived: bool = Query(False),
+        session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    return await _read_batch(session, [int(animal_id) for animal_id in ids.split(",")], include_archived)
+
+
+@router.post(
+    "/batch",
+    response_model=AnimalBatch,
+    dependencies=[Depends(get_current_user)],
+)
+async def read_animals_batch_post(
+        batch: AnimalBatchRequest,
+        session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    return await _read_batch(session, batch.ids, batch.include_archived)
+
+
+@router.get(
+    "/stats",
+    response_model=AnimalStats,
+    dependencies=[Depends(get_current_user)],
+)
+async def read_animal_stats(
+        age_bucket: int = Query(10, ge=1, le=150, description="Width of the age histogram buckets"),
+        session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+        filters: AnimalFilters = Depends(),
+):
+    return await crud.animals.get_animal_stats(session=session, filters=filters, age_bucket=age_bucket)
+
+
+@router.patch(
+    "/bulk",
+    response_model=AnimalBulkResult,
+    dependencies=[Depends(get_current_user)],
+)
+async def bulk_update_animals(
+        bulk: AnimalBulkUpdate,
+        session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    affected = await crud.animals.bulk_update_animals(
+        session=session,
+        selection=bulk,
+        changes=bulk.changes,
+    )
+    return AnimalBulkResult(affected=affected)
+
+
+@router.delete(
+    "/bulk",
+    response_model=AnimalBulkResult,
+    dependencies=[Depends(get_current_user)],
+)
+async def bulk_delete_animals(
+        bulk: AnimalBulkDelete,
+        session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    affected = await crud.animals.bulk_archive_animals(session=session, selection=bulk)
+    return AnimalBulkResult(affected=affected)
+
+
+def _animal_validators(animal_id: int, version) -> tuple:
+    _, related, seq, updated_at = version
+    return make_etag("animal", animal_id, related, seq), updated_at
+
+
+async def _load_animal(session: AsyncSession, animal_id: int, include_archived: bool):
+    # Version before payload: a write in between makes the ETag older than the
+    # body, which only costs a refetch, never a stale body kept as current.
+    version = await get_animal_version(session, animal_id, include_archived)
+    exists = version[0]
+    animal = await get_parent_by_id(session, animal_id, include_archived) if exists else None
+    return version, animal
+
+
 @router.get(
     "/{animal_id}",
     response_model=AnimalReadParentChildren,
     dependencies=[Depends(get_current_user)],
 )
 async def get_parent_view(
+        request: Request,
+        response: Response,
         animal_id: int = Path(ge=1),
+        include_archived: bool = Query(False),
         session: AsyncSession = Depends(db_helper.scoped_session_dependency)
 ):
-    animal = await get_parent_by_id(session, animal_id)
+    if "if-none-match" in request.headers:
+        # Never validate against a shared version: that flight may have started
+        # before the client's own last write and would answer a stale 304.
+        version = await get_animal_version(session, animal_id, include_archived)
+        exists = version[0]
+        if exists:
+            not_modified = conditional_response(request, response, *_animal_validators(animal_id, version))
+            if not_modified is not None:
+                return not_modified
+
+    version, animal = await singleflight.do(
+        "get_parent_by_id", (animal_id, include_archived),
+        lambda: _load_animal(session, animal_id, include_archived),
+    )
     if not animal:
         raise HTTPException(status_code=404, detail="Animal not found")
+    response.headers.update(cache_headers(*_animal_validators(animal_id, version)))
     return animal
 
 
@@ -66,12 +247,22 @@ async def get_parent_view(
     dependencies=[Depends(get_current_user)],
 )
 async def add_animal_with_children(
+        request: Request,
         animal: AnimalCreate,
+        idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
+        current_user: UserRead = Depends(get_current_user),
         session: AsyncSession = Depends(db_helper.scoped_session_dependency)
 ):
-    return await crud.animals.create_animal_full(
+    return await idempotent(
         session=session,
-        animal=animal
+        scope=f"add_animal:{current_user.id}",
+        key=idempotency_key,
+        body=await request.body(),
+        response_model=AnimalRead,
+        handler=lambda: crud.animals.create_animal_full(
+            session=session,
+            animal=animal
+        ),
     )
 
 
@@ -119,4 +310,4 @@ async def delete_animal(
         animal: Animal = Depends(get_animal_by_id),
         session: AsyncSession = Depends(db_helper.scoped_session_dependency),
 ) -> None:
-    await crud.animals.delete_animal(session=session, animal=animal)
+    await crud.animals.archive_animal(session=session, animal=animal)
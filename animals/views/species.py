@@ -1,13 +1,15 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status, Path
+from fastapi import APIRouter, Depends, status, Path, Request, Header, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from animals.crud import species
 from animals.dependencies import get_specie_by_id_or_404
 from animals.schemas.species import SpeciesRead, SpeciesCreate, SpeciesPartialUpdate, SpeciesUpdate
 from core import db_helper
+from core.idempotency import idempotent
 from core.models import Specie
+from core.singleflight import singleflight
 
 router = APIRouter(prefix="/api/v1/animals/species", tags=["animals/species"])
 
@@ -16,7 +18,7 @@ router = APIRouter(prefix="/api/v1/animals/species", tags=["animals/species"])
 async def list_species(
         session: AsyncSession = Depends(db_helper.scoped_session_dependency),
 ):
-    return await species.list_species(session)
+    return await singleflight.do("list_species", None, lambda: species.list_species(session))
 
 
 @router.get("/{specie_id}")
@@ -24,15 +26,29 @@ async def read_specie(
         specie_id: Annotated[int, Path(ge=1)],
         session: AsyncSession = Depends(db_helper.scoped_session_dependency),
 ):
-    return await get_specie_by_id_or_404(session=session, specie_id=specie_id)
+    specie = await singleflight.do(
+        "get_specie_by_id", specie_id, lambda: species.get_specie_by_id(session=session, specie_id=specie_id)
+    )
+    if specie is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Specie not found")
+    return specie
 
 
 @router.post("/add_specie", response_model=SpeciesRead)
 async def create_specie(
+        request: Request,
         species_in: SpeciesCreate,
+        idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
         session: AsyncSession = Depends(db_helper.scoped_session_dependency),
 ):
-    return await species.create_specie(species_in=species_in, session=session)
+    return await idempotent(
+        session=session,
+        scope="add_specie",
+        key=idempotency_key,
+        body=await request.body(),
+        response_model=SpeciesRead,
+        handler=lambda: species.create_specie(species_in=species_in, session=session),
+    )
 
 
 @router.put(
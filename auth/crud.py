@@ -1,20 +1,27 @@
 from fastapi import HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.schemas import UserCreate, UserRead
 from auth.security import hash_password, decode_token
 from core.database import db_helper
+from core.integrity import conflict_error
 from core.models import User
+from core.singleflight import singleflight
 
 
 async def create_user(session: AsyncSession, user: UserCreate):
-    hashed = hash_password(user.password)
+    hashed = await run_in_threadpool(hash_password, user.password)
     db_user = User(username=user.username, hashed_password=hashed)
     session.add(db_user)
-    await session.commit()
-    await session.refresh(db_user)
+    try:
+        await session.commit()
+    except IntegrityError as error:
+        await session.rollback()
+        raise conflict_error(error, {"users.username": "Username already registered"})
     return db_user
 
 
@@ -36,7 +43,7 @@ async def get_current_user(
     email = payload.get("sub")
     if email is None:
         raise HTTPException(status_code=401, detail="Invalid token")
-    db_user = await get_user_by_username(db, email)
+    db_user = await singleflight.do("get_user_by_username", email, lambda: get_user_by_username(db, email))
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     return UserRead.model_validate(db_user)
@@ -1,17 +1,22 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib and python-jose (with its cryptography backend) are slow to import,
+# so they are loaded on first use rather than whenever this module is imported.
+@lru_cache(maxsize=None)
+def pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 SECRET_KEY = "mysecretkey"
@@ -20,6 +25,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 300
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -31,6 +38,8 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 
 
 def decode_token(token: str):
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
@@ -1,7 +1,8 @@
 from datetime import timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Form
+from fastapi import APIRouter, Depends, HTTPException, Form, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -13,6 +14,8 @@ from auth.security import (
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from core.database import db_helper
+from core.rate_limit import RateLimit, client_ip
+from core.settings import settings
 
 # from users.schemas import User, UserCreate
 
@@ -20,23 +23,29 @@ router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+register_rate_limit = RateLimit("register", settings.rate_limit_register)
+login_rate_limit = RateLimit("login", settings.rate_limit_login)
 
-@router.post("/register", response_model=UserRead)
+
+async def throttle_login(request: Request, username: Annotated[str, Form()]) -> None:
+    # Runs before the handler, so throttled attempts never reach bcrypt.
+    await login_rate_limit.check(f"ip:{client_ip(request)}")
+    await login_rate_limit.check(f"user:{username.lower()}")
+
+
+@router.post("/register", response_model=UserRead, dependencies=[Depends(register_rate_limit)])
 async def register(user: UserCreate, session: AsyncSession = Depends(db_helper.scoped_session_dependency)):
-    db_user = await get_user_by_username(session, user.username)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
     return await create_user(session, user)
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(throttle_login)])
 async def login(
         username: Annotated[str, Form()],
         password: Annotated[str, Form()],
         session: AsyncSession = Depends(db_helper.scoped_session_dependency)
 ):
     db_user = await get_user_by_username(session, username)
-    if not db_user or not verify_password(password, db_user.hashed_password):
+    if not db_user or not await run_in_threadpool(verify_password, password, db_user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid username or password")
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -0,0 +1,103 @@
+import asyncio
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Connection, event, func, inspect, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.models import Change
+
+
+class ChangeSignal:
+    """Wakes long-polling readers in this process as soon as changes commit.
+
+    Writers in other processes are only picked up on the next poll interval.
+    """
+
+    def __init__(self):
+        self._event = asyncio.Event()
+        self._listeners: list[Callable[[], None]] = []
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        self._listeners.append(listener)
+
+    def notify(self) -> None:
+        for listener in self._listeners:
+            listener()
+        self._event.set()
+        self._event = asyncio.Event()
+
+    async def wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+change_signal = ChangeSignal()
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session: Session) -> None:
+    if session.info.pop("changes_pending", False):
+        change_signal.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop("changes_pending", None)
+
+
+# Arbitrary key for pg_advisory_xact_lock, shared by every change-log writer.
+CHANGE_LOG_LOCK = 0x7a6f6f
+
+
+def _lock_change_log(connection: Connection) -> None:
+    # Readers page by ``seq > since``. Postgres hands out seq values at INSERT
+    # but they only become visible at COMMIT, so a later seq could commit first
+    # and an earlier one would be skipped. Holding a lock until commit keeps
+    # commit order equal to seq order; SQLite already serializes writers.
+    if connection.dialect.name == "postgresql":
+        connection.execute(select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK)))
+
+
+@event.listens_for(Change, "before_insert")
+def _lock_before_insert(mapper, connection: Connection, target: Change) -> None:
+    _lock_change_log(connection)
+
+
+def snapshot(obj) -> dict:
+    return jsonable_encoder({
+        attr.key: getattr(obj, attr.key)
+        for attr in inspect(obj).mapper.column_attrs
+    })
+
+
+def record_change(session: AsyncSession, entity: str, obj, action: str) -> None:
+    """Append a change for ``obj`` to the log; it commits with the caller's transaction."""
+    session.add(Change(entity=entity, entity_id=obj.id, action=action, data=snapshot(obj)))
+    session.info["changes_pending"] = True
+
+
+async def record_row_changes(session: AsyncSession, entity: str, rows, action: str) -> None:
+    """Bulk variant of ``record_change`` for rows returned by set-based statements."""
+    if not rows:
+        return
+    await (await session.connection()).run_sync(_lock_change_log)
+    await session.execute(insert(Change), [
+        dict(entity=entity, entity_id=row.id, action=action, data=jsonable_encoder(dict(row._mapping)))
+        for row in rows
+    ])
+    session.info["changes_pending"] = True
+
+
+async def get_changes(session: AsyncSession, since: int, limit: int):
+    result = await session.scalars(
+        select(Change).where(Change.seq > since).order_by(Change.seq).limit(limit)
+    )
+    return result.all()
+
+
+async def get_last_seq(session: AsyncSession) -> int:
+    return await session.scalar(select(func.coalesce(func.max(Change.seq), 0)))
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Optional
+
+from changes.crud import get_changes, get_last_seq, change_signal
+from changes.schemas import ChangeRead
+from core import db_helper
+from core.pubsub import Hub
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+event_hub = Hub(settings.events_queue_size)
+
+
+class ChangeRelay:
+    """Tails the change log and publishes new entries to ``event_hub``.
+
+    The change log is the broker between workers: every API process runs one
+    relay, so a write committed by any of them reaches the subscribers of all
+    of them, with one query per process however many clients are connected.
+    """
+
+    def __init__(self, hub: Hub, batch_size: int = 500):
+        self.hub = hub
+        self.batch_size = batch_size
+        self.last_seq = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        async with db_helper.session_factory() as session:
+            self.last_seq = await get_last_seq(session)
+        self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                await self._relay()
+            except Exception:
+                logger.exception("Change relay failed")
+            await change_signal.wait(settings.changes_poll_interval)
+
+    async def _relay(self) -> None:
+        while True:
+            async with db_helper.session_factory() as session:
+                changes = await get_changes(session, since=self.last_seq, limit=self.batch_size)
+            for change in changes:
+                self.hub.publish(ChangeRead.model_validate(change))
+                self.last_seq = change.seq
+            if len(changes) < self.batch_size:
+                return
+
+
+change_relay = ChangeRelay(event_hub)
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ChangeRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    seq: int
+    entity: str
+    entity_id: int
+    action: str
+    data: Optional[dict] = None
+    created_at: datetime
+
+
+class ChangeBatch(BaseModel):
+    changes: list[ChangeRead] = []
+    last_seq: int
+    has_more: bool
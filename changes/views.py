@@ -0,0 +1,102 @@
+import time
+from typing import AsyncIterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.crud import get_current_user
+from changes.crud import get_changes, change_signal
+from changes.events import event_hub, change_relay
+from changes.schemas import ChangeBatch, ChangeRead
+from core import db_helper
+from core.settings import settings
+
+router = APIRouter(prefix="/api/v1/changes", tags=["changes"])
+events_router = APIRouter(prefix="/api/v1/events", tags=["changes"])
+
+
+@router.get(
+    "/",
+    response_model=ChangeBatch,
+    dependencies=[Depends(get_current_user)],
+)
+async def list_changes(
+        since: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        wait: float = Query(0, ge=0, le=settings.changes_max_wait, description="Long-poll timeout, seconds"),
+        session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    deadline = time.monotonic() + wait
+    while True:
+        changes = await get_changes(session, since=since, limit=limit + 1)
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            break
+        # Give the connection back to the pool while waiting.
+        await session.rollback()
+        await change_signal.wait(min(remaining, settings.changes_poll_interval))
+
+    return ChangeBatch(
+        changes=changes[:limit],
+        last_seq=changes[:limit][-1].seq if changes else since,
+        has_more=len(changes) > limit,
+    )
+
+
+def format_event(change: ChangeRead) -> str:
+    return f"id: {change.seq}\nevent: change\ndata: {change.model_dump_json()}\n\n"
+
+
+async def replay_changes(since: int, limit: int = 500) -> AsyncIterator[ChangeRead]:
+    # Short sessions per page so a stream never holds a pooled connection.
+    while True:
+        async with db_helper.session_factory() as session:
+            changes = await get_changes(session, since=since, limit=limit)
+        for change in changes:
+            yield ChangeRead.model_validate(change)
+        if len(changes) < limit:
+            return
+        since = changes[-1].seq
+
+
+async def event_stream(since: Optional[int], entity: Optional[str]) -> AsyncIterator[str]:
+    with event_hub.subscribe() as subscription:
+        # Everything the relay publishes from here on lands in the queue.
+        last_seq = change_relay.last_seq if since is None else since
+        resync = since is not None
+        yield f"retry: {int(settings.changes_poll_interval * 1000)}\n\n"
+        while True:
+            if resync:
+                subscription.overflowed = False
+                async for change in replay_changes(last_seq):
+                    if entity is None or change.entity == entity:
+                        yield format_event(change)
+                    last_seq = change.seq
+                resync = False
+
+            change = await subscription.get(settings.events_heartbeat)
+            if subscription.overflowed:
+                resync = True
+            elif change is None:
+                yield ": keepalive\n\n"
+            elif change.seq > last_seq:
+                if entity is None or change.entity == entity:
+                    yield format_event(change)
+                last_seq = change.seq
+
+
+@events_router.get(
+    "/",
+    response_class=StreamingResponse,
+    dependencies=[Depends(get_current_user)],
+)
+async def stream_events(
+        entity: Optional[Literal["animal", "specie"]] = Query(None),
+        last_event_id: Optional[int] = Header(None, ge=0, description="Resume after this seq"),
+):
+    return StreamingResponse(
+        event_stream(last_event_id, entity),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,61 @@
+from itertools import groupby
+from typing import Any
+
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _with_defaults(table: Table, rows: list[dict[str, Any]]) -> tuple[list[str], list[tuple]]:
+    # COPY bypasses SQLAlchemy, so Python-side column defaults (timestamps)
+    # have to be filled in here; server-side ones are left to the database.
+    columns = list(rows[0])
+    defaults = {
+        column.name: column.default
+        for column in table.columns
+        if column.name not in columns and column.default is not None
+        and (column.default.is_scalar or column.default.is_callable)
+    }
+    columns.extend(defaults)
+    records = []
+    for row in rows:
+        values = {
+            name: default.arg if default.is_scalar else default.arg(None)
+            for name, default in defaults.items()
+        }
+        values.update(row)
+        records.append(tuple(values[name] for name in columns))
+    return columns, records
+
+
+async def bulk_load(session: AsyncSession, table: Table, rows: list[dict[str, Any]]) -> None:
+    """Insert ``rows`` into ``table`` inside the session's transaction.
+
+    On Postgres this streams the rows with ``COPY``; elsewhere it falls back to
+    an executemany ``INSERT``. Columns a row leaves out get their defaults.
+    """
+    # One statement per run of rows with the same keys, in input order.
+    for _, group in groupby(rows, key=lambda row: tuple(row)):
+        await _load(session, table, list(group))
+
+
+async def _load(session: AsyncSession, table: Table, rows: list[dict[str, Any]]) -> None:
+    connection = await session.connection()
+    if connection.dialect.name != "postgresql":
+        await session.execute(insert(table), rows)
+        return
+
+    from asyncpg.exceptions import IntegrityConstraintViolationError
+
+    columns, records = _with_defaults(table, rows)
+    driver_connection = (await connection.get_raw_connection()).driver_connection
+    if not driver_connection.is_in_transaction():
+        # The driver opens its transaction on the first statement; start it so
+        # the COPY commits or rolls back together with the rest of the session.
+        await connection.exec_driver_sql("SELECT 1")
+    try:
+        await driver_connection.copy_records_to_table(
+            table.name, schema_name=table.schema, columns=columns, records=records,
+        )
+    except IntegrityConstraintViolationError as error:
+        raise IntegrityError(f"COPY {table.name}", None, error) from error
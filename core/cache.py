@@ -0,0 +1,47 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+class ResultCache:
+    """Small LRU cache with a TTL.
+
+    Entries are dropped explicitly through ``clear`` on local writes; the TTL
+    bounds how stale a worker can be after writes made by other workers.
+    A reader takes ``generation`` before querying and passes it to ``set``,
+    so a result read before a ``clear`` is not stored after it.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.generation = 0
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
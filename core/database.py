@@ -1,9 +1,15 @@
+import traceback
 from asyncio import current_task
+from contextlib import AsyncExitStack
+from functools import cached_property
 
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext, make_url
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
     async_scoped_session,
+    AsyncEngine,
     AsyncSession,
 )
 
@@ -11,12 +17,31 @@ from core import settings
 
 
 class DatabaseHelper:
-    def __init__(self, url: str, echo: bool = False):
-        self.engine = create_async_engine(
-            url=url,
-            echo=echo,
+    """Owns the engine and session factory, both created on first use.
+
+    Importing the app (tests, CLI tools, alembic) doesn't load a database
+    driver or build a pool until something actually talks to the database.
+    """
+
+    def __init__(self, url: str, echo: bool = False, **engine_options):
+        self.url = url
+        self.echo = echo
+        self.engine_options = engine_options
+
+    @cached_property
+    def engine(self) -> AsyncEngine:
+        engine = create_async_engine(
+            url=self.url,
+            echo=self.echo,
+            **self.engine_options,
         )
-        self.session_factory = async_sessionmaker(
+        if engine.dialect.name == "sqlite":
+            event.listen(engine.sync_engine, "handle_error", _release_failed_cursor)
+        return engine
+
+    @cached_property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(
             bind=self.engine,
             autoflush=False,
             autocommit=False,
@@ -37,11 +62,49 @@ class DatabaseHelper:
 
     async def scoped_session_dependency(self) -> AsyncSession:
         session = self.get_scoped_session()
-        yield session
-        await session.close()
+        try:
+            yield session
+        finally:
+            # Also on errors: a 401/429 must not keep its pooled connection.
+            await session.close()
+
+    async def dispose(self) -> None:
+        if "engine" in self.__dict__:
+            await self.engine.dispose()
+
+    async def warm_up(self, connections: int = 1) -> None:
+        # Hold several connections at once so the pool really opens them,
+        # then hand them back to be reused by the first requests.
+        async with AsyncExitStack() as stack:
+            for _ in range(max(connections, 1)):
+                await stack.enter_async_context(self.engine.connect())
+
+
+def _release_failed_cursor(context: ExceptionContext) -> None:
+    # The traceback of a failed statement keeps its aiosqlite cursor alive in
+    # a reference cycle. Left to the garbage collector, the cursor gets reset
+    # on the event loop thread while its connection may be back in the pool
+    # and waiting on a lock for another request, which stalls the whole loop
+    # until the busy timeout. Clearing the finished frames frees it right away.
+    error, seen = context.original_exception, set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        traceback.clear_frames(error.__traceback__)
+        error = error.__cause__ or error.__context__
+
+
+def _engine_options(url: str) -> dict:
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.settings.db_pool_size,
+        "max_overflow": settings.settings.db_max_overflow,
+        "pool_pre_ping": True,
+    }
 
 
 db_helper = DatabaseHelper(
     url=settings.settings.db_url,
     echo=settings.settings.db_echo,
+    **_engine_options(settings.settings.db_url),
 )
@@ -0,0 +1,56 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette import status
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    # Only the ETag validates. Last-Modified is sent for information: it has
+    # one-second resolution and can't see every write that changes a
+    # response, such as a child moving to another parent.
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match (RFC 9110 13.1.2).
+    return _strip_weak(etag) in {_strip_weak(tag) for tag in if_none_match.split(",")}
+
+
+def conditional_response(
+        request: Request,
+        response: Response,
+        etag: str,
+        last_modified: Optional[datetime],
+) -> Optional[Response]:
+    headers = cache_headers(etag, last_modified)
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional, Type
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+from starlette.responses import JSONResponse
+
+from core.database import db_helper
+from core.models import IdempotencyKey
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Same-key requests inside this worker queue up here and replay the first
+# response; other workers see the pending row and get a 409 until it is
+# finished or its lease runs out.
+_locks: dict[tuple[str, str], asyncio.Lock] = {}
+_waiters: dict[tuple[str, str], int] = {}
+
+
+def _request_hash(body: bytes) -> str:
+    # Hash the JSON as sent, normalized, so retries that only differ in key
+    # order or whitespace still match.
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True).encode()
+    except ValueError:
+        pass
+    return hashlib.sha256(body).hexdigest()
+
+
+def _stale(now: datetime):
+    # Finished records expire after the TTL; pending ones after the lease, so
+    # a worker that died mid-request doesn't block the key for the whole TTL.
+    # A live handler keeps renewing its lease through ``_keep_claim``.
+    return or_(
+        IdempotencyKey.created_at < now - timedelta(seconds=settings.idempotency_ttl),
+        and_(
+            IdempotencyKey.status_code.is_(None),
+            IdempotencyKey.created_at < now - timedelta(seconds=settings.idempotency_lease),
+        ),
+    )
+
+
+async def _claim(
+        session: AsyncSession,
+        scope: str,
+        key: str,
+        request_hash: str,
+        now: datetime,
+) -> Optional[IdempotencyKey]:
+    """Claim the key with a pending record, or return the live record already there.
+
+    Retries of a finished request only read; writes happen when the key is
+    new or its record is stale.
+    """
+    by_key = (IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+    existing = await session.scalar(select(IdempotencyKey).where(*by_key, ~_stale(now)))
+    if existing is not None:
+        return existing
+
+    # Take over a stale record; the condition makes sure only one worker does.
+    taken = await session.execute(
+        update(IdempotencyKey)
+        .where(*by_key, _stale(now))
+        .values(request_hash=request_hash, status_code=None, response=None, created_at=now)
+    )
+    if taken.rowcount == 0:
+        session.add(IdempotencyKey(scope=scope, key=key, request_hash=request_hash, created_at=now))
+    try:
+        await session.commit()
+        return None
+    except IntegrityError:
+        await session.rollback()
+    return await session.scalar(select(IdempotencyKey).where(*by_key))
+
+
+async def _keep_claim(scope: str, key: str, claimed_at: datetime) -> None:
+    """Renew a pending claim until cancelled, so a slow handler isn't taken over."""
+    while True:
+        await asyncio.sleep(settings.idempotency_lease / 3)
+        renewed_at = datetime.utcnow()
+        try:
+            async with db_helper.session_factory() as session:
+                await session.execute(
+                    update(IdempotencyKey)
+                    .where(
+                        IdempotencyKey.scope == scope,
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.status_code.is_(None),
+                        IdempotencyKey.created_at == claimed_at,
+                    )
+                    .values(created_at=renewed_at)
+                )
+                await session.commit()
+            claimed_at = renewed_at
+        except Exception:
+            logger.exception("Could not renew the claim on Idempotency-Key %s", key)
+
+
+async def _run_once(
+        session: AsyncSession,
+        scope: str,
+        key: str,
+        request_hash: str,
+        response_model: Type[BaseModel],
+        handler: Callable[[], Awaitable],
+):
+    claimed_at = datetime.utcnow()
+    existing = await _claim(session, scope, key, request_hash, claimed_at)
+    if existing is not None:
+        if existing.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request",
+            )
+        if existing.status_code is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        return JSONResponse(
+            content=existing.response,
+            status_code=existing.status_code,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    keeper = asyncio.create_task(_keep_claim(scope, key, claimed_at))
+    try:
+        result = await handler()
+    except BaseException:
+        await session.rollback()
+        await session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        )
+        await session.commit()
+        raise
+    finally:
+        keeper.cancel()
+
+    # If this doesn't get stored the claim stays pending until its lease runs
+    # out, after which a retry runs the handler again.
+    body = jsonable_encoder(response_model.model_validate(result, from_attributes=True))
+    await session.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        .values(status_code=status.HTTP_200_OK, response=body)
+    )
+    await session.commit()
+    return body
+
+
+async def idempotent(
+        session: AsyncSession,
+        scope: str,
+        key: Optional[str],
+        body: bytes,
+        response_model: Type[BaseModel],
+        handler: Callable[[], Awaitable],
+):
+    """Run ``handler`` at most once per ``(scope, key)`` within ``idempotency_ttl``.
+
+    Retries with the same key and body get the stored response back; reusing
+    a key with a different body is rejected.
+    """
+    if key is None:
+        return await handler()
+
+    lock_key = (scope, key)
+    lock = _locks.setdefault(lock_key, asyncio.Lock())
+    _waiters[lock_key] = _waiters.get(lock_key, 0) + 1
+    try:
+        async with lock:
+            return await _run_once(session, scope, key, _request_hash(body), response_model, handler)
+    finally:
+        _waiters[lock_key] -= 1
+        if not _waiters[lock_key]:
+            del _waiters[lock_key]
+            del _locks[lock_key]
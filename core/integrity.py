@@ -0,0 +1,38 @@
+import re
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+# Unique constraints and indexes by the name Postgres reports, mapped to the
+# "table.column" SQLite reports for the same violation.
+UNIQUE_CONSTRAINTS = {
+    "animals_name_key": "animals.name",
+    "species_name_key": "species.name",
+    "ix_species_name_lower": "species.name",
+    "users_username_key": "users.username",
+    "ix_users_username_lower": "users.username",
+}
+
+_SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: (?:index '(?P<index>[^']+)'|(?P<columns>[^,\s]+))")
+
+
+def violated_constraint(error: IntegrityError) -> Optional[str]:
+    """``"table.column"`` of the unique constraint ``error`` violated, if known."""
+    # asyncpg errors carry the name; SQLAlchemy's adapter keeps them as __cause__.
+    for orig in (error.orig, getattr(error.orig, "__cause__", None)):
+        name = getattr(orig, "constraint_name", None)
+        if name:
+            return UNIQUE_CONSTRAINTS.get(name)
+    match = _SQLITE_UNIQUE.search(str(error.orig))
+    if match is None:
+        return None
+    if match["index"]:
+        return UNIQUE_CONSTRAINTS.get(match["index"])
+    return match["columns"]
+
+
+def conflict_error(error: IntegrityError, details: dict[str, str]) -> HTTPException:
+    """400 naming the conflicting field, picked from ``details`` by constraint."""
+    detail = details.get(violated_constraint(error), "An integrity error occurred.")
+    return HTTPException(status_code=400, detail=detail)
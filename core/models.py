@@ -1,28 +1,57 @@
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import String, Integer, ForeignKey, DateTime
+from sqlalchemy import String, Integer, ForeignKey, DateTime, JSON, Index, Float, Boolean, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.base import Base
+from core.dialects import utcnow
 
 
 class User(Base):
+    # Names differing only in case are the same user; the exact-case
+    # constraint stays as the index for lookups by username.
+    __table_args__ = (
+        Index("ix_users_username_lower", text("lower(username)"), unique=True),
+    )
+    # Fetch server-generated values with RETURNING as part of the flush.
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Mapped[int] = mapped_column(primary_key=True)
     username: Mapped[str] = mapped_column(String(32), unique=True)
     hashed_password: Mapped[str] = mapped_column(String)
-    created_at = mapped_column(DateTime, default=datetime.utcnow, nullable=True)
+    created_at = mapped_column(DateTime, server_default=utcnow(), nullable=True)
 
 
 class Specie(Base):
+    __table_args__ = (
+        Index("ix_species_name_lower", text("lower(name)"), unique=True),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(32), unique=True)
     animals: Mapped[List["Animal"]] = relationship(
         back_populates="species"
     )
+    updated_at = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=True)
+
+
+# Archived animals stay in the table for the records; hot queries only ever
+# read live rows, so the sort indexes leave archived ones out.
+LIVE_ANIMALS = text("archived_at IS NULL")
 
 
 class Animal(Base):
+    # One index per sortable column, ending in id so the tiebreaker is covered.
+    __table_args__ = (
+        Index("ix_animals_age_id", "age", "id", sqlite_where=LIVE_ANIMALS, postgresql_where=LIVE_ANIMALS),
+        Index("ix_animals_sex_id", "sex", "id", sqlite_where=LIVE_ANIMALS, postgresql_where=LIVE_ANIMALS),
+        Index("ix_animals_created_at_id", "created_at", "id", sqlite_where=LIVE_ANIMALS, postgresql_where=LIVE_ANIMALS),
+        Index("ix_animals_species_id_id", "species_id", "id", sqlite_where=LIVE_ANIMALS, postgresql_where=LIVE_ANIMALS),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(32), unique=True)
     species_id: Mapped[Optional[int]] = mapped_column(
@@ -38,7 +67,8 @@ class Animal(Base):
 
     parent_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("animals.id"),
-        nullable=True
+        nullable=True,
+        index=True
     )
     parent: Mapped[Optional["Animal"]] = relationship(
         "Animal",
@@ -49,4 +79,65 @@ class Animal(Base):
         "Animal",
         back_populates="parent"
     )
+    created_at = mapped_column(DateTime, server_default=utcnow(), nullable=True)
+    updated_at = mapped_column(DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=True)
+    archived_at = mapped_column(DateTime, nullable=True)
+
+
+class Change(Base):
+    __table_args__ = (
+        # Latest change per row, for versioning responses by seq.
+        Index("ix_changes_entity_entity_id_seq", "entity", "entity_id", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq: Mapped[int] = mapped_column(primary_key=True)
+    entity: Mapped[str] = mapped_column(String(32))
+    entity_id: Mapped[int] = mapped_column(Integer)
+    action: Mapped[str] = mapped_column(String(16))
+    data = mapped_column(JSON, nullable=True)
     created_at = mapped_column(DateTime, default=datetime.utcnow, nullable=True)
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    tat: Mapped[float] = mapped_column(Float)
+    allowed: Mapped[bool] = mapped_column(Boolean)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64))
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response = mapped_column(JSON, nullable=True)
+    created_at = mapped_column(DateTime, default=datetime.utcnow, nullable=True)
+
+
+class Job(Base):
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(64))
+    status: Mapped[str] = mapped_column(String(16), default="pending", index=True)
+    params = mapped_column(JSON, nullable=True)
+    result = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    progress: Mapped[float] = mapped_column(Float, default=0.0)
+    created_by: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    created_at = mapped_column(DateTime, default=datetime.utcnow, nullable=True)
+    started_at = mapped_column(DateTime, nullable=True)
+    finished_at = mapped_column(DateTime, nullable=True)
+    # Running jobs whose lease has passed belong to a dead worker and get reclaimed.
+    locked_until = mapped_column(DateTime, nullable=True)
+
+
+class JobOutput(Base):
+    """One chunk of a job's output, so large results are never one JSON value."""
+    __tablename__ = "job_outputs"
+
+    job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)
+    items = mapped_column(JSON)
@@ -0,0 +1,62 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from core.metrics import metrics
+
+
+class Subscription:
+    """One subscriber's bounded inbox.
+
+    Publishing never waits for a slow subscriber: when the inbox is full its
+    backlog is dropped and ``overflowed`` is set, and the reader is expected
+    to catch up from the durable source before reading the inbox again.
+    """
+
+    def __init__(self, maxsize: int):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, message: Any) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            metrics.increment("events.overflows")
+
+    async def get(self, timeout: float) -> Optional[Any]:
+        """Next message, or ``None`` if nothing arrived within ``timeout``."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Hub:
+    """In-process fan-out of messages to every current subscriber."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._subscriptions: set[Subscription] = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[Subscription]:
+        subscription = Subscription(self.maxsize)
+        self._subscriptions.add(subscription)
+        metrics.set_gauge("events.subscribers", len(self._subscriptions))
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
+            metrics.set_gauge("events.subscribers", len(self._subscriptions))
+
+    def publish(self, message: Any) -> None:
+        metrics.increment("events.published")
+        for subscription in list(self._subscriptions):
+            subscription.put(message)
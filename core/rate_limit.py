@@ -0,0 +1,110 @@
+import math
+import time
+from threading import Lock
+
+from fastapi import HTTPException, Request
+from sqlalchemy import case, literal
+from starlette import status
+
+from core.database import db_helper
+from core.dialects import upsert
+from core.models import RateLimitBucket
+from core.settings import settings
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Parse ``"10/minute"`` into ``(10, 60.0)``."""
+    count, _, period = rate.partition("/")
+    return int(count), float(_PERIODS[period.strip()])
+
+
+def _gcra(tat: float, now: float, interval: float, burst: int) -> tuple[bool, float, float]:
+    # GCRA is a token bucket stored as one timestamp: the "theoretical arrival
+    # time" at which the bucket would be full again.
+    start = max(tat, now)
+    new_tat = start + interval
+    if new_tat - now <= interval * burst:
+        return True, new_tat, 0.0
+    return False, tat, new_tat - now - interval * burst
+
+
+class MemoryBackend:
+    max_keys = 10000
+
+    def __init__(self):
+        self._lock = Lock()
+        self._buckets: dict[str, float] = {}
+
+    async def take(self, key: str, burst: int, interval: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            allowed, tat, retry_after = _gcra(self._buckets.get(key, now), now, interval, burst)
+            self._buckets[key] = tat
+            if len(self._buckets) > self.max_keys:
+                # Buckets whose TAT is in the past are full again; forgetting them is free.
+                self._buckets = {k: v for k, v in self._buckets.items() if v > now}
+        return retry_after
+
+
+class DatabaseBackend:
+    """Shares buckets between workers through the app database.
+
+    Each check is a single upsert, so concurrent workers cannot both spend the
+    same token.
+    """
+
+    async def take(self, key: str, burst: int, interval: float) -> float:
+        now = time.time()
+        table = RateLimitBucket.__table__
+        start = case((table.c.tat > now, table.c.tat), else_=literal(now))
+        allowed = start + interval - now <= interval * burst
+
+        async with db_helper.session_factory() as session:
+            statement = upsert(
+                session.bind.dialect,
+                table,
+                values={"key": key, "tat": now + interval, "allowed": True},
+                index_elements=[table.c.key],
+                set_={
+                    "tat": case((allowed, start + interval), else_=table.c.tat),
+                    "allowed": allowed,
+                },
+            ).returning(table.c.tat, table.c.allowed)
+            tat, was_allowed = (await session.execute(statement)).one()
+            await session.commit()
+
+        if was_allowed:
+            return 0.0
+        return max(tat, now) + interval - now - interval * burst
+
+
+_backend = DatabaseBackend() if settings.rate_limit_backend == "database" else MemoryBackend()
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    """Route dependency that answers 429 with Retry-After once ``rate`` is spent."""
+
+    def __init__(self, scope: str, rate: str):
+        self.scope = scope
+        self.burst, period = parse_rate(rate)
+        self.interval = period / self.burst
+
+    async def check(self, key: str) -> None:
+        if not settings.rate_limit_enabled:
+            return
+        retry_after = await _backend.take(f"{self.scope}:{key}", self.burst, self.interval)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    async def __call__(self, request: Request) -> None:
+        await self.check(f"ip:{client_ip(request)}")
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from core.metrics import metrics
+
+
+class SingleFlight:
+    """Coalesces concurrent identical reads into one execution.
+
+    The first caller for a ``(query, params)`` key runs the query; callers that
+    arrive while it is in flight await the same result instead of hitting the
+    database again. Only use it for read-only results: followers receive the
+    leader's objects.
+    """
+
+    def __init__(self):
+        self._calls: dict[tuple[str, Hashable], asyncio.Future] = {}
+
+    async def do(self, query: str, params: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        key = (query, params)
+        call = self._calls.get(key)
+        if call is not None:
+            metrics.increment(f"singleflight.{query}.shared")
+            try:
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                if not call.cancelled():
+                    raise
+                # The leader was cancelled, not us: run the query ourselves.
+                return await fn()
+
+        metrics.increment(f"singleflight.{query}.executed")
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as exc:
+            call.set_exception(exc)
+            # Mark it retrieved so a flight without followers doesn't log a warning.
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,46 @@
+import json
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core import db_helper
+from core.models import Job, JobOutput
+from jobs.registry import JOB_HANDLERS
+from jobs.schemas import JobCreate
+
+
+async def create_job(session: AsyncSession, job_in: JobCreate, created_by: str) -> Job:
+    if job_in.kind not in JOB_HANDLERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown job kind, expected one of: {', '.join(sorted(JOB_HANDLERS))}",
+        )
+    job = Job(kind=job_in.kind, params=job_in.params, created_by=created_by)
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: int):
+    return await session.get(Job, job_id)
+
+
+async def iter_job_output(job_id: int) -> AsyncIterator[str]:
+    """The job's output as NDJSON, one chunk in memory at a time."""
+    seq = -1
+    while True:
+        # A short session per chunk, so a slow download holds no connection.
+        async with db_helper.session_factory() as session:
+            chunk = await session.scalar(
+                select(JobOutput)
+                .where(JobOutput.job_id == job_id, JobOutput.seq > seq)
+                .order_by(JobOutput.seq)
+                .limit(1)
+            )
+        if chunk is None:
+            return
+        yield "".join(json.dumps(item) + "\n" for item in chunk.items)
+        seq = chunk.seq
@@ -0,0 +1,50 @@
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core import db_helper
+from core.models import Job, JobOutput
+
+
+class JobContext:
+    def __init__(self, job_id: int, params: dict):
+        self.job_id = job_id
+        self.params = params
+        self._output_seq = 0
+
+    async def report(self, progress: float) -> None:
+        """Store progress (0..1) in its own transaction so pollers see it right away."""
+        async with db_helper.session_factory() as session:
+            await session.execute(
+                update(Job).where(Job.id == self.job_id).values(progress=min(max(progress, 0.0), 1.0))
+            )
+            await session.commit()
+
+    async def write_output(self, items: list) -> None:
+        """Append a chunk to the job's output, served by ``GET /jobs/{id}/output``."""
+        async with db_helper.session_factory() as session:
+            session.add(JobOutput(job_id=self.job_id, seq=self._output_seq, items=items))
+            await session.commit()
+        self._output_seq += 1
+
+
+JobHandler = Callable[[JobContext, AsyncSession], Awaitable[Any]]
+
+
+class JobSpec(NamedTuple):
+    handler: JobHandler
+    max_concurrency: int
+
+
+JOB_HANDLERS: dict[str, JobSpec] = {}
+
+
+def job(kind: str, max_concurrency: int = 1):
+    """Register a job handler; at most ``max_concurrency`` of a kind run per worker process."""
+
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = JobSpec(handler, max_concurrency)
+        return handler
+
+    return decorator
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class JobCreate(BaseModel):
+    kind: str = Field(max_length=64)
+    params: dict = {}
+
+
+class JobRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    kind: str
+    status: str
+    progress: float
+    error: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobResult(BaseModel):
+    id: int
+    status: str
+    result: Any = None
+    error: Optional[str] = None
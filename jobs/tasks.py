@@ -0,0 +1,103 @@
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from animals.crud.animals import get_animal_stats
+from animals.schemas.animals import AnimalCreate, AnimalFilters
+from changes.crud import record_row_changes
+from core.bulk import bulk_load
+from core.models import Animal, Specie
+from jobs.registry import job, JobContext
+
+CHUNK_SIZE = 500
+
+
+# Encoding and validation are CPU-bound; handlers run them in the threadpool
+# so a worker inside the API process doesn't stall its event loop.
+
+def _encode_rows(rows) -> list:
+    return [jsonable_encoder(dict(row._mapping)) for row in rows]
+
+
+def _validate_animals(items: list) -> list[dict]:
+    # Unset fields are left out so the database fills in created_at.
+    return [AnimalCreate.model_validate(item).model_dump(exclude_none=True) for item in items]
+
+
+@job("export_animals")
+async def export_animals(ctx: JobContext, session: AsyncSession):
+    """Write every animal to the job output, ``CHUNK_SIZE`` rows per chunk."""
+    total = await session.scalar(select(func.count(Animal.id))) or 1
+    exported = 0
+    last_id = 0
+    while True:
+        rows = (await session.execute(
+            select(*Animal.__table__.columns)
+            .where(Animal.id > last_id)
+            .order_by(Animal.id)
+            .limit(CHUNK_SIZE)
+        )).all()
+        await session.rollback()
+        if not rows:
+            break
+        await ctx.write_output(await run_in_threadpool(_encode_rows, rows))
+        exported += len(rows)
+        last_id = rows[-1].id
+        await ctx.report(exported / total)
+    return {"count": exported}
+
+
+async def _missing_ids(session: AsyncSession, model, ids: set[int]) -> set[int]:
+    if not ids:
+        return set()
+    found = await session.scalars(select(model.id).where(model.id.in_(ids)))
+    return ids - set(found)
+
+
+@job("import_animals")
+async def import_animals(ctx: JobContext, session: AsyncSession):
+    """Insert ``params["animals"]``, committing every ``CHUNK_SIZE`` rows.
+
+    Chunks are committed separately so progress can be written in between and
+    no single write transaction holds the database for the whole import. On
+    Postgres each chunk is loaded with ``COPY``.
+    """
+    animals = await run_in_threadpool(_validate_animals, ctx.params.get("animals", []))
+
+    missing_species = await _missing_ids(session, Specie, {a["species_id"] for a in animals if a.get("species_id")})
+    if missing_species:
+        raise ValueError(f"Unknown species ids: {sorted(missing_species)}")
+    missing_parents = await _missing_ids(session, Animal, {a["parent_id"] for a in animals if a.get("parent_id")})
+    if missing_parents:
+        raise ValueError(f"Unknown parent ids: {sorted(missing_parents)}")
+    await session.rollback()
+
+    imported = 0
+    for start in range(0, len(animals), CHUNK_SIZE):
+        chunk = animals[start:start + CHUNK_SIZE]
+        try:
+            await bulk_load(session, Animal.__table__, chunk)
+            # COPY has no RETURNING; names are unique, so read the new rows back by name.
+            created = await session.execute(
+                select(*Animal.__table__.columns).where(Animal.name.in_([a["name"] for a in chunk]))
+            )
+            await record_row_changes(session, "animal", created.all(), "create")
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise ValueError(
+                f"Rows {start + 1}-{start + len(chunk)} contain animal names that already exist; "
+                f"{imported} animals were imported before them"
+            ) from None
+        imported += len(chunk)
+        await ctx.report(imported / len(animals))
+    return {"imported": imported}
+
+
+@job("animal_stats", max_concurrency=2)
+async def animal_stats(ctx: JobContext, session: AsyncSession):
+    filters = AnimalFilters.model_validate(ctx.params.get("filters", {}))
+    stats = await get_animal_stats(session, filters=filters, age_bucket=ctx.params.get("age_bucket", 10))
+    return stats.model_dump()
@@ -0,0 +1,55 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from auth.crud import get_current_user
+from auth.schemas import UserRead
+from core import db_helper
+from jobs import crud
+from jobs.schemas import JobCreate, JobRead, JobResult
+from jobs.worker import job_worker
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+
+
+async def get_job_or_404(
+        job_id: Annotated[int, Path(ge=1)],
+        session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    job = await crud.get_job(session, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.post("/", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+        job_in: JobCreate,
+        current_user: UserRead = Depends(get_current_user),
+        session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+):
+    job = await crud.create_job(session, job_in, created_by=current_user.username)
+    job_worker.notify()
+    return job
+
+
+@router.get("/{job_id}", response_model=JobRead, dependencies=[Depends(get_current_user)])
+async def read_job(job=Depends(get_job_or_404)):
+    return job
+
+
+@router.get("/{job_id}/result", response_model=JobResult, dependencies=[Depends(get_current_user)])
+async def read_job_result(job=Depends(get_job_or_404)):
+    if job.status not in ("succeeded", "failed"):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job is not finished yet")
+    return JobResult(id=job.id, status=job.status, result=job.result, error=job.error)
+
+
+@router.get("/{job_id}/output", dependencies=[Depends(get_current_user)])
+async def read_job_output(job=Depends(get_job_or_404)):
+    if job.status != "succeeded":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job has not succeeded")
+    return StreamingResponse(crud.iter_job_output(job.id), media_type="application/x-ndjson")
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, delete, or_, select, update
+
+import jobs.tasks  # noqa: F401  (registers the job handlers)
+from core import db_helper
+from core.models import Job, JobOutput
+from core.settings import settings
+from jobs.registry import JOB_HANDLERS, JobContext
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """Pool of asyncio tasks that claim pending jobs from the database and run them.
+
+    Claims are a conditional UPDATE, so several pools (API processes or
+    ``python -m jobs.worker``) can share one jobs table safely. A claim is a
+    lease that the worker renews while the job runs; if the worker dies, the
+    lease runs out and another worker picks the job up again.
+    """
+
+    def __init__(self, concurrency: int, poll_interval: float, lease: float = 60.0):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        self._running: dict[str, int] = defaultdict(int)
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run_forever()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run_forever(self) -> None:
+        while True:
+            claimed = await self._claim()
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self._execute(*claimed)
+
+    @staticmethod
+    def _claimable(now: datetime):
+        return or_(
+            Job.status == "pending",
+            and_(Job.status == "running", Job.locked_until < now),
+        )
+
+    async def _claim(self) -> Optional[tuple[int, str]]:
+        # Kinds already at their limit stay out of the query, or a queue of
+        # them would fill the candidates and starve the kinds behind it.
+        kinds = [kind for kind, spec in JOB_HANDLERS.items() if self._running[kind] < spec.max_concurrency]
+        if not kinds:
+            return None
+        async with db_helper.session_factory() as session:
+            candidates = (await session.execute(
+                select(Job.id, Job.kind, Job.status)
+                .where(self._claimable(datetime.utcnow()), Job.kind.in_(kinds))
+                .order_by(Job.id)
+                .limit(self.concurrency * 2)
+            )).all()
+            await session.rollback()
+
+            for job_id, kind, job_status in candidates:
+                if self._running[kind] >= JOB_HANDLERS[kind].max_concurrency:
+                    continue
+                self._running[kind] += 1
+                now = datetime.utcnow()
+                result = await session.execute(
+                    update(Job)
+                    .where(Job.id == job_id, self._claimable(now))
+                    .values(status="running", started_at=now, locked_until=now + timedelta(seconds=self.lease))
+                )
+                await session.commit()
+                if result.rowcount == 1:
+                    if job_status == "running":
+                        logger.warning("Job %s (%s) lost its worker, running it again", job_id, kind)
+                    return job_id, kind
+                self._running[kind] -= 1
+        return None
+
+    async def _keep_lease(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                async with db_helper.session_factory() as session:
+                    await session.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.status == "running")
+                        .values(locked_until=datetime.utcnow() + timedelta(seconds=self.lease))
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception("Could not renew the lease of job %s", job_id)
+
+    async def _execute(self, job_id: int, kind: str) -> None:
+        lease = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            async with db_helper.session_factory() as session:
+                # Drop output left by an earlier attempt that didn't finish.
+                await session.execute(delete(JobOutput).where(JobOutput.job_id == job_id))
+                await session.commit()
+                job = await session.get(Job, job_id)
+                result = await JOB_HANDLERS[kind].handler(JobContext(job_id, job.params or {}), session)
+            values = dict(status="succeeded", result=jsonable_encoder(result), progress=1.0)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back so another worker picks it up.
+            await self._finish(job_id, dict(status="pending", started_at=None, progress=0.0, locked_until=None))
+            raise
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job_id, kind)
+            values = dict(status="failed", error=str(exc) or exc.__class__.__name__)
+        finally:
+            lease.cancel()
+            self._running[kind] -= 1
+        await self._finish(job_id, dict(values, finished_at=datetime.utcnow(), locked_until=None))
+
+    @staticmethod
+    async def _finish(job_id: int, values: dict) -> None:
+        async with db_helper.session_factory() as session:
+            await session.execute(update(Job).where(Job.id == job_id).values(**values))
+            await session.commit()
+
+
+job_worker = JobWorker(
+    concurrency=settings.jobs_workers,
+    poll_interval=settings.jobs_poll_interval,
+    lease=settings.jobs_lease,
+)
+
+
+async def main() -> None:
+    worker = JobWorker(
+        concurrency=max(settings.jobs_workers, 1),
+        poll_interval=settings.jobs_poll_interval,
+        lease=settings.jobs_lease,
+    )
+    await worker.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await worker.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
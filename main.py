@@ -1,21 +1,83 @@
+import logging
+import time
 from contextlib import asynccontextmanager
 
-import uvicorn
 from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
 from starlette.responses import JSONResponse
 
+from animals.crud.animals import (
+    get_animals,
+    get_animals_count,
+    get_parent_by_id,
+    get_animals_version,
+    get_animal_version,
+)
+from animals.crud.species import list_species
+from animals.schemas.animals import AnimalFilters
 from animals.views.species import router as species_router
 from animals.views.animals import router as animals_router
+from auth.crud import get_user_by_username
+from auth.security import pwd_context
 from auth.views import router as auth_router
+from changes.events import change_relay
+from changes.views import router as changes_router, events_router
+from jobs.views import router as jobs_router
+from jobs.worker import job_worker
+from core import db_helper
+from core.metrics import metrics
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up() -> None:
+    started = time.perf_counter()
+    configure_mappers()
+    # Loaded lazily so plain imports stay fast; the server loads it up front.
+    pwd_context()
+    try:
+        await db_helper.warm_up(settings.db_warmup_connections)
+        # Run the hot statements once so their compiled forms are cached
+        # before the first real request needs them; the version queries run
+        # first on every listing and detail request.
+        async with db_helper.session_factory() as session:
+            await get_animals_version(session)
+            await get_animal_version(session, 0)
+            await get_animals(session=session, page=1, size=1, filters=AnimalFilters())
+            await get_animals_count(session)
+            await get_parent_by_id(session, 0)
+            await get_user_by_username(session, "")
+            # Fills the species reference cache.
+            await list_species(session)
+    except SQLAlchemyError:
+        logger.exception("Database warm-up failed")
+    elapsed = time.perf_counter() - started
+    metrics.set_gauge("startup_warmup_seconds", elapsed)
+    logger.info("Warm-up finished in %.3fs", elapsed)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await warm_up()
+    await change_relay.start()
+    if settings.jobs_workers:
+        await job_worker.start()
     yield
+    await job_worker.stop()
+    await change_relay.stop()
+    await db_helper.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_compresslevel,
+)
 
 
 @app.exception_handler(ValidationError)
@@ -34,6 +96,9 @@ async def validation_exception_handler(request: Request, exc: ValidationError):
 app.include_router(auth_router)
 app.include_router(animals_router)
 app.include_router(species_router)
+app.include_router(changes_router)
+app.include_router(events_router)
+app.include_router(jobs_router)
 
 
 @app.get("/")
@@ -46,5 +111,12 @@ async def say_hello(name: str):
     return {"message": f"Hello {name}"}
 
 
+@app.get("/metrics")
+async def read_metrics():
+    return metrics.snapshot()
+
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host="127.0.0.1", port=5555, reload=True)
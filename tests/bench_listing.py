@@ -0,0 +1,107 @@
+"""Benchmark of building the animal listing statement, per request vs cached per shape.
+
+Run from the repository root; it uses its own temporary SQLite database::
+
+    python -m tests.bench_listing [--animals 2000] [--iterations 3000]
+
+"build" is the statement plus its cache key, which SQLAlchemy derives on
+every execution; "query" is a full ``get_animals`` call.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DATABASE = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+os.environ["DB_URL"] = f"sqlite+aiosqlite:///{DATABASE}"
+os.environ["DB_ECHO"] = "false"
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from animals.crud import animals as crud  # noqa: E402
+from animals.schemas.animals import ANIMAL_EXPANDABLE, AnimalFilters  # noqa: E402
+from core import db_helper  # noqa: E402
+from core.models import Animal, Base, Specie  # noqa: E402
+
+SHAPES = {
+    "no filters": (AnimalFilters(), None),
+    "sex+age range, sort=-age,name": (AnimalFilters(sex="male", min_age=3, max_age=40), "-age,name"),
+    "name+only_parents+min_children": (AnimalFilters(name="a", only_parents=True, min_children=1), "created_at"),
+}
+
+
+def build_per_request(filters: AnimalFilters, sort: str):
+    """The listing statement as it was built for every request before shapes were cached."""
+    query = select(Animal).options(
+        selectinload(Animal.parent).selectinload(Animal.species),
+        selectinload(Animal.children).selectinload(Animal.species),
+        selectinload(Animal.species),
+    )
+    query = crud.apply_filters(query, filters, Animal)
+    query = query.order_by(*crud.order_by_clauses(crud.sort_shape(sort)))
+    return query.offset(10).limit(10)
+
+
+def build_cached(filters: AnimalFilters, sort: str):
+    statement, _ = crud.animals_statement(2, 10, filters, sort, ANIMAL_EXPANDABLE)
+    return statement
+
+
+def time_build(build, filters: AnimalFilters, sort: str, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        build(filters, sort)._generate_cache_key()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def time_query(filters: AnimalFilters, sort: str, iterations: int) -> float:
+    async with db_helper.session_factory() as session:
+        for _ in range(20):
+            await crud.get_animals(session, 2, 10, filters, sort)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await crud.get_animals(session, 2, 10, filters, sort)
+            session.expunge_all()
+        return (time.perf_counter() - started) / iterations * 1e3
+
+
+async def populate(animals: int) -> None:
+    async with db_helper.engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with db_helper.session_factory() as session:
+        await session.execute(insert(Specie), [{"name": f"Specie {i}"} for i in range(10)])
+        await session.execute(insert(Animal), [
+            {
+                "name": f"a{i}",
+                "age": i % 60,
+                "sex": "male" if i % 2 else "female",
+                "species_id": i % 10 + 1,
+                "parent_id": i // 5 + 1 if i > 10 else None,
+            }
+            for i in range(1, animals + 1)
+        ])
+        await session.commit()
+
+
+async def main(animals: int, iterations: int) -> None:
+    await populate(animals)
+    print(f"{'shape':34} {'build per request':>18} {'build cached':>13} {'query':>9}")
+    for name, (filters, sort) in SHAPES.items():
+        per_request = time_build(build_per_request, filters, sort, iterations)
+        cached = time_build(build_cached, filters, sort, iterations)
+        query = await time_query(filters, sort, max(iterations // 10, 1))
+        print(f"{name:34} {per_request:15.0f} us {cached:10.0f} us {query:6.1f} ms")
+    await db_helper.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--animals", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=3000)
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.animals, args.iterations))
+    finally:
+        os.remove(DATABASE)
@@ -0,0 +1,77 @@
+import os
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from changes.crud import change_signal
+from core import db_helper
+from core.models import Base
+from core.settings import settings
+from main import app
+
+# Tables are dropped and recreated here, so point this at a scratch database.
+POSTGRES_URL = os.environ.get(
+    "TEST_POSTGRES_URL", "postgresql+asyncpg://postgres@localhost:5432/zoo_test"
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+async def _reachable(url: str) -> bool:
+    engine = create_async_engine(url, connect_args={"timeout": 2})
+    try:
+        async with engine.connect():
+            return True
+    except Exception:
+        return False
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+async def db_url(request, tmp_path):
+    """Points ``db_helper`` at an empty database with the current schema."""
+    if request.param == "sqlite":
+        url = f"sqlite+aiosqlite:///{tmp_path / 'zoo.sqlite3'}"
+    else:
+        url = POSTGRES_URL
+        if not await _reachable(url):
+            pytest.skip(f"Postgres is not reachable at {url}")
+
+    saved = db_helper.url, db_helper.engine_options
+    await db_helper.dispose()
+    db_helper.__dict__.pop("engine", None)
+    db_helper.__dict__.pop("session_factory", None)
+    db_helper.url, db_helper.engine_options = url, {}
+    async with db_helper.engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    # Drop whatever the caches kept from the previous database.
+    change_signal.notify()
+    try:
+        yield url
+    finally:
+        async with db_helper.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await db_helper.dispose()
+        db_helper.__dict__.pop("engine", None)
+        db_helper.__dict__.pop("session_factory", None)
+        db_helper.url, db_helper.engine_options = saved
+
+
+@pytest.fixture
+async def client(db_url, monkeypatch):
+    """API client logged in as a fresh user, without rate limits."""
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        credentials = {"username": "keeper", "password": "password1"}
+        response = await client.post("/api/v1/users/register", json=credentials)
+        assert response.status_code == 200, response.text
+        response = await client.post("/api/v1/users/login", data=credentials)
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        yield client
@@ -0,0 +1,82 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _add_animal(client, **fields) -> dict:
+    response = await client.post("/api/v1/animals/add_animal", json={"age": 1, "sex": "male", **fields})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_detail_etag_follows_related_writes(client):
+    parent = await _add_animal(client, name="Leo")
+    child = await _add_animal(client, name="Cub", parent_id=parent["id"])
+
+    response = await client.get(f"/api/v1/animals/{parent['id']}")
+    etag = response.headers["ETag"]
+    response = await client.get(f"/api/v1/animals/{parent['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.patch(f"/api/v1/animals/{child['id']}", json={"age": 2})
+    response = await client.get(f"/api/v1/animals/{parent['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["children"][0]["age"] == 2
+
+
+async def test_listing_etag_follows_writes(client):
+    animal = await _add_animal(client, name="Leo")
+
+    response = await client.get("/api/v1/animals/")
+    etag = response.headers["ETag"]
+    response = await client.get("/api/v1/animals/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.patch(f"/api/v1/animals/{animal['id']}", json={"age": 2})
+    response = await client.get("/api/v1/animals/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_detail_etag_changes_when_a_child_moves_away(client):
+    first = await _add_animal(client, name="Leo")
+    second = await _add_animal(client, name="Max")
+    child = await _add_animal(client, name="Cub", parent_id=first["id"])
+
+    response = await client.get(f"/api/v1/animals/{first['id']}")
+    etag = response.headers["ETag"]
+    await client.patch(f"/api/v1/animals/{child['id']}", json={"parent_id": second["id"]})
+
+    response = await client.get(f"/api/v1/animals/{first['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["children"] == []
+
+
+async def test_detail_etag_follows_species_renames(client):
+    response = await client.post("/api/v1/animals/species/add_specie", json={"name": "Lion"})
+    specie = response.json()
+    animal = await _add_animal(client, name="Leo", species_id=specie["id"])
+
+    response = await client.get(f"/api/v1/animals/{animal['id']}")
+    etag = response.headers["ETag"]
+    await client.patch(f"/api/v1/animals/species/{specie['id']}", json={"name": "Tiger"})
+
+    response = await client.get(f"/api/v1/animals/{animal['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["species"]["name"] == "Tiger"
+
+
+async def test_if_modified_since_alone_never_answers_304(client):
+    animal = await _add_animal(client, name="Leo")
+
+    response = await client.get(f"/api/v1/animals/{animal['id']}")
+    last_modified = response.headers["Last-Modified"]
+    response = await client.get(f"/api/v1/animals/{animal['id']}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 200
+
+    response = await client.get("/api/v1/animals/")
+    assert "Last-Modified" in response.headers
+    response = await client.get("/api/v1/animals/", headers={"If-Modified-Since": response.headers["Last-Modified"]})
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
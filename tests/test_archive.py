@@ -0,0 +1,75 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _add_animal(client, **fields) -> dict:
+    response = await client.post("/api/v1/animals/add_animal", json={"age": 1, "sex": "male", **fields})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_archived_animal_is_hidden_unless_asked_for(client):
+    leo = await _add_animal(client, name="Leo")
+    await _add_animal(client, name="Max")
+
+    response = await client.delete(f"/api/v1/animals/{leo['id']}")
+    assert response.status_code == 204
+
+    assert (await client.get(f"/api/v1/animals/{leo['id']}")).status_code == 404
+    response = await client.get(f"/api/v1/animals/{leo['id']}", params={"include_archived": True})
+    assert response.status_code == 200
+    assert response.json()["archived_at"] is not None
+
+    listing = (await client.get("/api/v1/animals/")).json()
+    assert listing["total"] == 1
+    assert [animal["name"] for animal in listing["animals"]] == ["Max"]
+    listing = (await client.get("/api/v1/animals/", params={"include_archived": True})).json()
+    assert listing["total"] == 2
+
+    batch = (await client.get("/api/v1/animals/batch", params={"ids": str(leo["id"])})).json()
+    assert batch["animals"][0]["found"] is False
+    batch = (await client.get("/api/v1/animals/batch", params={"ids": str(leo["id"]), "include_archived": True})).json()
+    assert batch["animals"][0]["found"] is True
+
+
+async def test_archived_animal_cannot_be_changed_or_archived_again(client):
+    leo = await _add_animal(client, name="Leo")
+    await client.delete(f"/api/v1/animals/{leo['id']}")
+
+    assert (await client.patch(f"/api/v1/animals/{leo['id']}", json={"age": 2})).status_code == 404
+    assert (await client.delete(f"/api/v1/animals/{leo['id']}")).status_code == 404
+
+
+async def test_children_keep_their_archived_parent(client):
+    leo = await _add_animal(client, name="Leo")
+    cub = await _add_animal(client, name="Cub", parent_id=leo["id"])
+    await client.delete(f"/api/v1/animals/{leo['id']}")
+
+    response = await client.get(f"/api/v1/animals/{cub['id']}")
+    assert response.json()["parent"]["id"] == leo["id"]
+
+
+async def test_archived_names_stay_taken(client):
+    leo = await _add_animal(client, name="Leo")
+    await client.delete(f"/api/v1/animals/{leo['id']}")
+
+    response = await client.post("/api/v1/animals/add_animal", json={"name": "Leo", "age": 1, "sex": "male"})
+    assert response.status_code == 400
+
+
+async def test_bulk_archive(client):
+    leo = await _add_animal(client, name="Leo", sex="male")
+    mia = await _add_animal(client, name="Mia", sex="female")
+    rex = await _add_animal(client, name="Rex", sex="male")
+
+    response = await client.request("DELETE", "/api/v1/animals/bulk", json={"ids": [leo["id"], mia["id"]]})
+    assert response.json() == {"affected": 2}
+    # Already archived rows are not selected again.
+    response = await client.request("DELETE", "/api/v1/animals/bulk", json={"filters": {"sex": "male"}})
+    assert response.json() == {"affected": 1}
+
+    listing = (await client.get("/api/v1/animals/")).json()
+    assert listing["total"] == 0
+    response = await client.get(f"/api/v1/animals/{rex['id']}", params={"include_archived": True})
+    assert response.json()["archived_at"] is not None
@@ -0,0 +1,67 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _add_animal(client, **fields) -> dict:
+    response = await client.post("/api/v1/animals/add_animal", json={"age": 1, "sex": "male", **fields})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_bulk_update_by_ids(client):
+    animals = [await _add_animal(client, name=name) for name in ("Leo", "Max", "Rex")]
+
+    response = await client.patch("/api/v1/animals/bulk", json={
+        "ids": [animals[0]["id"], animals[1]["id"]], "changes": {"age_delta": 2},
+    })
+    assert response.json() == {"affected": 2}
+    ages = [(await client.get(f"/api/v1/animals/{animal['id']}")).json()["age"] for animal in animals]
+    assert ages == [3, 3, 1]
+
+
+@pytest.mark.parametrize("new_parent", ["self", "child", "grandchild"])
+async def test_bulk_update_rejects_parent_cycles(client, new_parent):
+    leo = await _add_animal(client, name="Leo")
+    cub = await _add_animal(client, name="Cub", parent_id=leo["id"])
+    grandcub = await _add_animal(client, name="Grandcub", parent_id=cub["id"])
+    parent = {"self": leo, "child": cub, "grandchild": grandcub}[new_parent]
+
+    response = await client.patch("/api/v1/animals/bulk", json={
+        "ids": [leo["id"]], "changes": {"parent_id": parent["id"]},
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "An animal cannot be its own parent or ancestor"
+    assert (await client.get(f"/api/v1/animals/{leo['id']}")).json()["parent"] is None
+
+
+async def test_bulk_update_accepts_unrelated_parent(client):
+    leo = await _add_animal(client, name="Leo")
+    cub = await _add_animal(client, name="Cub", parent_id=leo["id"])
+    max_ = await _add_animal(client, name="Max")
+
+    response = await client.patch("/api/v1/animals/bulk", json={
+        "ids": [cub["id"]], "changes": {"parent_id": max_["id"]},
+    })
+    assert response.json() == {"affected": 1}
+
+
+@pytest.mark.parametrize("filters", [{}, {"include_archived": True}])
+async def test_bulk_requires_a_filter(client, filters):
+    await _add_animal(client, name="Leo")
+
+    response = await client.patch("/api/v1/animals/bulk", json={"filters": filters, "changes": {"age": 5}})
+    assert response.status_code == 422
+    response = await client.request("DELETE", "/api/v1/animals/bulk", json={"filters": filters})
+    assert response.status_code == 422
+    assert (await client.get("/api/v1/animals/")).json()["total"] == 1
+
+
+async def test_bulk_update_by_filters(client):
+    await _add_animal(client, name="Leo", sex="male")
+    await _add_animal(client, name="Mia", sex="female")
+
+    response = await client.patch("/api/v1/animals/bulk", json={
+        "filters": {"sex": "female"}, "changes": {"age": 7},
+    })
+    assert response.json() == {"affected": 1}
@@ -0,0 +1,32 @@
+from core.cache import ResultCache
+
+
+def test_set_and_get():
+    cache = ResultCache()
+    cache.set("key", 1)
+    assert cache.get("key") == (True, 1)
+    assert cache.get("other") == (False, None)
+
+
+def test_clear_drops_entries():
+    cache = ResultCache()
+    cache.set("key", 1)
+    cache.clear()
+    assert cache.get("key") == (False, None)
+
+
+def test_result_read_before_clear_is_not_stored():
+    cache = ResultCache()
+    generation = cache.generation
+    cache.clear()  # A write committed while the result was being read.
+    cache.set("key", "stale", generation)
+    assert cache.get("key") == (False, None)
+
+    cache.set("key", "fresh", cache.generation)
+    assert cache.get("key") == (True, "fresh")
+
+
+def test_expired_entries_are_misses():
+    cache = ResultCache(ttl=-1)
+    cache.set("key", 1)
+    assert cache.get("key") == (False, None)
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from changes.crud import get_changes, record_change
+from core import db_helper
+from core.bulk import bulk_load
+from core.dialects import utcnow
+from core.models import Animal, Specie
+from core.rate_limit import DatabaseBackend
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_bulk_load_fills_defaults(db_url):
+    rows = [{"name": f"Animal {i}", "age": i, "sex": "male"} for i in range(3)]
+    async with db_helper.session_factory() as session:
+        await bulk_load(session, Animal.__table__, rows)
+        await session.commit()
+
+        animals = (await session.scalars(select(Animal).order_by(Animal.id))).all()
+        assert [animal.name for animal in animals] == ["Animal 0", "Animal 1", "Animal 2"]
+        assert all(animal.created_at is not None for animal in animals)
+
+
+async def test_bulk_load_raises_integrity_error_and_rolls_back(db_url):
+    async with db_helper.session_factory() as session:
+        with pytest.raises(IntegrityError):
+            await bulk_load(session, Specie.__table__, [{"name": "Lion"}, {"name": "Lion"}])
+        await session.rollback()
+
+        assert await session.scalar(select(func.count()).select_from(Specie)) == 0
+
+
+async def test_rate_limit_database_backend(db_url):
+    backend = DatabaseBackend()
+    assert await backend.take("test:key", burst=2, interval=60) == 0
+    assert await backend.take("test:key", burst=2, interval=60) == 0
+    assert await backend.take("test:key", burst=2, interval=60) > 0
+    assert await backend.take("test:other", burst=2, interval=60) == 0
+
+
+async def test_change_log_commits_in_seq_order(db_url):
+    async def write(name: str, committed: asyncio.Event = None) -> None:
+        async with db_helper.session_factory() as session:
+            specie = Specie(name=name)
+            session.add(specie)
+            await session.flush()
+            record_change(session, "species", specie, "created")
+            await session.flush()
+            if committed is not None:
+                await committed.wait()
+            await session.commit()
+
+    # The first writer holds the change log until it commits, so the second
+    # one can't take a later seq and become visible before it.
+    release = asyncio.Event()
+    first = asyncio.create_task(write("First", release))
+    await asyncio.sleep(0.2)
+    second = asyncio.create_task(write("Second"))
+    try:
+        await asyncio.sleep(0.2)
+        assert not second.done()
+    finally:
+        release.set()
+        await asyncio.gather(first, second)
+    async with db_helper.session_factory() as session:
+        changes = await get_changes(session, since=0, limit=10)
+    assert [change.data["name"] for change in changes] == ["First", "Second"]
+
+
+async def test_utcnow_reads_the_clock_inside_a_transaction(db_url):
+    async with db_helper.session_factory() as session:
+        first = await session.scalar(select(utcnow()))
+        await asyncio.sleep(0.05)
+        second = await session.scalar(select(utcnow()))
+    assert second > first
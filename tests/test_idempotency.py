@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from animals.schemas.species import SpeciesRead
+from core import db_helper
+from core.idempotency import _run_once, _request_hash, idempotent
+from core.models import IdempotencyKey, Specie
+from core.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def _species_count() -> int:
+    async with db_helper.session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(Specie))
+
+
+async def _add_specie(client, name: str, key: str = "key-1"):
+    return await client.post(
+        "/api/v1/animals/species/add_specie", json={"name": name}, headers={"Idempotency-Key": key},
+    )
+
+
+async def test_retry_replays_the_stored_response(client):
+    first = await _add_specie(client, "Lion")
+    retry = await _add_specie(client, "Lion")
+
+    assert first.status_code == retry.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert await _species_count() == 1
+
+
+async def test_key_reused_with_a_different_body_is_rejected(client):
+    await _add_specie(client, "Lion")
+    response = await _add_specie(client, "Tiger")
+
+    assert response.status_code == 422
+    assert await _species_count() == 1
+
+
+async def test_concurrent_requests_with_one_key_create_one_row(client):
+    responses = await asyncio.gather(*(_add_specie(client, "Lion") for _ in range(8)))
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert sum("Idempotent-Replayed" in response.headers for response in responses) == 7
+    assert await _species_count() == 1
+
+
+async def test_slow_handler_keeps_its_claim(db_url, monkeypatch):
+    monkeypatch.setattr(settings, "idempotency_lease", 0.3)
+    body = b'{"name": "Lion"}'
+
+    async def slow_handler():
+        await asyncio.sleep(1)
+        return {"id": 1, "name": "Lion"}
+
+    async with db_helper.session_factory() as session:
+        running = asyncio.create_task(idempotent(session, "test", "key-1", body, SpeciesRead, slow_handler))
+        await asyncio.sleep(0.6)
+        # Another worker retrying after the lease would have run out.
+        async with db_helper.session_factory() as other:
+            with pytest.raises(HTTPException) as error:
+                await _run_once(other, "test", "key-1", _request_hash(body), SpeciesRead, slow_handler)
+        assert error.value.status_code == 409
+        assert await running == {"id": 1, "name": "Lion"}
+
+
+async def test_abandoned_claim_is_taken_over(db_url):
+    body = b'{"name": "Lion"}'
+    async with db_helper.session_factory() as session:
+        session.add(IdempotencyKey(
+            scope="test", key="key-1", request_hash=_request_hash(body),
+            created_at=datetime.utcnow() - timedelta(seconds=settings.idempotency_lease + 1),
+        ))
+        await session.commit()
+
+    async def handler():
+        return {"id": 1, "name": "Lion"}
+
+    async with db_helper.session_factory() as session:
+        assert await idempotent(session, "test", "key-1", body, SpeciesRead, handler) == {"id": 1, "name": "Lion"}
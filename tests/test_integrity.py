@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from core import db_helper
+from core.models import Animal, Specie, User
+
+pytestmark = pytest.mark.anyio
+
+WRITERS = 12
+
+
+async def _count(column, value: str) -> int:
+    async with db_helper.session_factory() as session:
+        return await session.scalar(select(func.count()).where(func.lower(column) == value.lower()))
+
+
+def _assert_one_wins(responses, detail: str) -> None:
+    codes = sorted(response.status_code for response in responses)
+    assert codes == [200] + [400] * (len(responses) - 1), [response.text for response in responses]
+    assert all(response.json()["detail"] == detail for response in responses if response.status_code == 400)
+
+
+async def test_concurrent_animal_creates(client):
+    responses = await asyncio.gather(*(
+        client.post("/api/v1/animals/add_animal", json={"name": "Leo", "age": 1, "sex": "male"})
+        for _ in range(WRITERS)
+    ))
+    _assert_one_wins(responses, "Animal with this name already exists")
+    assert await _count(Animal.name, "Leo") == 1
+
+
+async def test_concurrent_animal_renames(client):
+    ids = []
+    for i in range(WRITERS):
+        response = await client.post("/api/v1/animals/add_animal", json={"name": f"Animal {i}", "age": 1, "sex": "male"})
+        ids.append(response.json()["id"])
+
+    responses = await asyncio.gather(*(
+        client.patch(f"/api/v1/animals/{animal_id}", json={"name": "Leo"}) for animal_id in ids
+    ))
+    _assert_one_wins(responses, "Animal with this name already exists")
+    assert await _count(Animal.name, "Leo") == 1
+
+
+async def test_concurrent_species_creates_ignore_case(client):
+    responses = await asyncio.gather(*(
+        client.post("/api/v1/animals/species/add_specie", json={"name": name})
+        for name in ["Lion", "lion", "LION"] * (WRITERS // 3)
+    ))
+    _assert_one_wins(responses, "Species with this name already exists")
+    assert await _count(Specie.name, "lion") == 1
+
+
+async def test_concurrent_registrations_ignore_case(client):
+    responses = await asyncio.gather(*(
+        client.post("/api/v1/users/register", json={"username": username, "password": "password1"})
+        for username in ["ranger", "Ranger"] * (WRITERS // 2)
+    ))
+    _assert_one_wins(responses, "Username already registered")
+    assert await _count(User.username, "ranger") == 1
@@ -0,0 +1,37 @@
+import pytest
+
+from core import db_helper
+from core.models import Job
+from jobs.registry import JOB_HANDLERS
+from jobs.worker import JobWorker
+
+pytestmark = pytest.mark.anyio
+
+
+async def _enqueue(*kinds: str) -> list[int]:
+    async with db_helper.session_factory() as session:
+        jobs = [Job(kind=kind, status="pending", params={}) for kind in kinds]
+        session.add_all(jobs)
+        await session.commit()
+        return [job.id for job in jobs]
+
+
+async def test_claim_skips_saturated_kinds(db_url):
+    assert JOB_HANDLERS["export_animals"].max_concurrency == 1
+    *exports, stats = await _enqueue(*["export_animals"] * 6, "animal_stats")
+    worker = JobWorker(concurrency=2, poll_interval=1)
+
+    assert await worker._claim() == (exports[0], "export_animals")
+    # The export slot is taken: the next claim reaches past the queued exports.
+    assert await worker._claim() == (stats, "animal_stats")
+    assert await worker._claim() is None
+
+
+async def test_claim_takes_over_an_expired_lease(db_url):
+    [job_id] = await _enqueue("animal_stats")
+    worker = JobWorker(concurrency=1, poll_interval=1, lease=-1)
+    assert await worker._claim() == (job_id, "animal_stats")
+
+    # The lease ran out without renewal, as if the worker died.
+    other = JobWorker(concurrency=1, poll_interval=1)
+    assert await other._claim() == (job_id, "animal_stats")
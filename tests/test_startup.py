@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded on first use (login, first query, running the server), not on import.
+# The Postgres dialect module is not among them: declaring the partial
+# indexes in core.models already needs it.
+LAZY_MODULES = ["jose", "passlib", "bcrypt", "cryptography", "aiosqlite", "asyncpg", "uvicorn"]
+
+# Seconds for the cumulative import of main; ~0.8s on a laptop.
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET", "1.5"))
+
+PROBE = """
+import json, sys
+import main
+from core.database import db_helper
+print(json.dumps({
+    "loaded": [name for name in %r if name in sys.modules],
+    "engine": "engine" in db_helper.__dict__,
+}))
+""" % (LAZY_MODULES,)
+
+
+def _import_main() -> tuple[dict, float]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    # stderr lines look like "import time: self [us] | cumulative | name".
+    cumulative = next(
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and line.split("|")[-1].strip() == "main"
+    )
+    return json.loads(result.stdout.splitlines()[-1]), cumulative / 1e6
+
+
+def test_import_main_stays_lazy():
+    probe, _ = _import_main()
+    assert probe["loaded"] == []
+    assert probe["engine"] is False
+
+
+def test_import_main_within_budget():
+    # Best of three, so one slow run on a busy machine doesn't fail it.
+    seconds = min(_import_main()[1] for _ in range(3))
+    assert seconds <= IMPORT_TIME_BUDGET, f"import main took {seconds:.2f}s"